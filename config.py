@@ -11,6 +11,11 @@ class Config:
     # Telegram Bot
     telegram_bot_token: str = ""
     
+    # Telegram webhook (polling is used when webhook_url is empty)
+    webhook_url: str = ""
+    webhook_port: int = 8443
+    webhook_secret: str = ""
+    
     # Bybit API
     bybit_api_key: str = ""
     bybit_api_secret: str = ""
@@ -30,6 +35,8 @@ class Config:
     llm_router_model: str = ""  # optional lighter model for intent routing
     llm_temperature: float = 0.7
     llm_max_tokens: int = 131072
+    llm_concurrency: int = 4  # max in-flight LLM calls
+    rich_formatting: bool = False  # full LLM-written replies instead of templates
     
     # Bot Auth
     bot_auth_username: str = "admin"
@@ -68,6 +75,17 @@ def get_config() -> Config:
         llm_max_tokens = int(os.getenv("LLM_MAX_TOKENS", "4096"))
     except ValueError:
         llm_max_tokens = 4096
+    try:
+        llm_concurrency = max(1, int(os.getenv("LLM_CONCURRENCY", "4")))
+    except ValueError:
+        llm_concurrency = 4
+    webhook_url = os.getenv("TELEGRAM_WEBHOOK_URL", "").strip()
+    webhook_secret = os.getenv("TELEGRAM_WEBHOOK_SECRET", "").strip()
+    try:
+        webhook_port = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443"))
+    except ValueError:
+        webhook_port = 8443
+    rich_formatting = os.getenv("RICH_FORMATTING", "false").lower() == "true"
     bybit_api_key = os.getenv("BYBIT_API_KEY")
     bybit_api_secret = os.getenv("BYBIT_API_SECRET")
     bybit_testnet = os.getenv("BYBIT_TESTNET", "false").lower() == "true"
@@ -107,12 +125,17 @@ def get_config() -> Config:
 
     return Config(
         telegram_bot_token=telegram_token,
+        webhook_url=webhook_url,
+        webhook_port=webhook_port,
+        webhook_secret=webhook_secret,
         zai_api_key=zai_api_key,
         zai_base_url=zai_base_url,
         llm_model=llm_model,
         llm_router_model=llm_router_model,
         llm_temperature=llm_temperature,
         llm_max_tokens=llm_max_tokens,
+        llm_concurrency=llm_concurrency,
+        rich_formatting=rich_formatting,
         bybit_api_key=bybit_api_key,
         bybit_api_secret=bybit_api_secret,
         bybit_testnet=bybit_testnet,
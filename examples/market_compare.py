@@ -21,19 +21,62 @@ Notes:
 
 from __future__ import annotations
 import argparse
+import asyncio
+import sys
 import time
+from functools import wraps
 from typing import Dict, Tuple, Optional, List
-import requests
+import httpx
+import orjson
+
+try:
+    from tabulate import tabulate
+except ImportError:  # tabulate is optional; falls back to the built-in layout
+    tabulate = None
 
 # --------- HTTP basics ---------
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": "market-compare/0.1"})
+HEADERS = {"User-Agent": "market-compare/0.1"}
 TIMEOUT = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRIES = 2
+BACKOFF = 0.2
+QUOTE_TTL = 1.0  # seconds a fetched quote is reused
+
+def make_client() -> httpx.AsyncClient:
+    """One HTTP/2 client multiplexes every exchange query over a few connections."""
+    return httpx.AsyncClient(
+        http2=True,
+        headers=HEADERS,
+        timeout=TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=16),
+    )
 
-def _get(url: str, params: Dict[str, str] | None = None) -> Dict:
-    r = SESSION.get(url, params=params, timeout=TIMEOUT)
+async def _get(client: httpx.AsyncClient, url: str, params: Dict[str, str] | None = None) -> Dict:
+    # Transient 429/5xx responses are retried with exponential backoff
+    for attempt in range(RETRIES + 1):
+        r = await client.get(url, params=params)
+        if r.status_code not in RETRY_STATUSES or attempt == RETRIES:
+            break
+        await asyncio.sleep(BACKOFF * 2 ** attempt)
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
+
+# (adapter, *args) -> (expires_at, result)
+_QUOTE_CACHE: Dict[Tuple, Tuple[float, object]] = {}
+
+def ttl_cached(fn):
+    """Reuse an adapter's result for QUOTE_TTL seconds per argument set (client excluded)."""
+    @wraps(fn)
+    async def wrapper(client: httpx.AsyncClient, *args):
+        key = (fn.__name__, *args)
+        now = time.monotonic()
+        hit = _QUOTE_CACHE.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        result = await fn(client, *args)
+        _QUOTE_CACHE[key] = (now + QUOTE_TTL, result)
+        return result
+    return wrapper
 
 # --------- Symbol mappers ---------
 def norm(symbol: str) -> str:
@@ -66,62 +109,104 @@ def to_binance(symbol: str) -> str:
     return norm(symbol)
 
 # --------- Adapters (return bid, ask, ts_ms) ---------
-def fetch_binance(symbol: str) -> Tuple[float, float, int]:
-    sym = to_binance(symbol)
-    data = _get("https://api.binance.com/api/v3/ticker/bookTicker", {"symbol": sym})
-    bid = float(data["bidPrice"])
-    ask = float(data["askPrice"])
+Quote = Tuple[float, float, int]
+
+@ttl_cached
+async def fetch_binance_all(client: httpx.AsyncClient) -> Dict[str, Quote]:
+    # bookTicker without a symbol returns every spot market in one response
+    data = await _get(client, "https://api.binance.com/api/v3/ticker/bookTicker")
     ts = int(time.time() * 1000)
-    return bid, ask, ts
+    out = {}
+    for d in data:
+        try:
+            out[d["symbol"]] = (float(d["bidPrice"]), float(d["askPrice"]), ts)
+        except (KeyError, TypeError, ValueError):
+            continue  # one malformed market must not sink the whole snapshot
+    return out
 
-def fetch_bybit(symbol: str) -> Tuple[float, float, int]:
-    sym = to_bybit_linear(symbol)
-    # Linear (perp) category; also returns for some spot symbols.
-    data = _get("https://api.bybit.com/v5/market/tickers",
-                {"category": "linear", "symbol": sym})
-    if not data.get("result") or not data["result"].get("list"):
-        # Try spot as fallback
-        data = _get("https://api.bybit.com/v5/market/tickers",
-                    {"category": "spot", "symbol": sym})
-    item = data["result"]["list"][0]
-    bid = float(item.get("bid1Price") or item.get("bidPrice") or item["lastPrice"])
-    ask = float(item.get("ask1Price") or item.get("askPrice") or item["lastPrice"])
-    ts = int(item.get("ts") or time.time() * 1000)
-    return bid, ask, ts
+@ttl_cached
+async def fetch_bybit_all(client: httpx.AsyncClient, category: str) -> Dict[str, Quote]:
+    # tickers without a symbol returns the whole category
+    data = await _get(client, "https://api.bybit.com/v5/market/tickers", {"category": category})
+    ts = int(data.get("time") or time.time() * 1000)
+    out = {}
+    for item in (data.get("result") or {}).get("list") or []:
+        try:
+            bid = float(item.get("bid1Price") or item.get("bidPrice") or item["lastPrice"])
+            ask = float(item.get("ask1Price") or item.get("askPrice") or item["lastPrice"])
+            out[item["symbol"]] = (bid, ask, ts)
+        except (KeyError, TypeError, ValueError):
+            continue  # one malformed market must not sink the whole snapshot
+    return out
+
+# BingX symbols whose ticker came back without a book; these go straight to depth
+_BINGX_FALLBACK: set[str] = set()
 
-def fetch_bingx(symbol: str) -> Tuple[float, float, int]:
+async def _bingx_depth(client: httpx.AsyncClient, sym: str) -> Tuple[float, float]:
+    """Top of book from the depth endpoint."""
+    depth = await _get(client, "https://open-api.bingx.com/openApi/spot/market/depth", {"symbol": sym, "limit": 5})
+    bids = depth.get("data", {}).get("bids") or []
+    asks = depth.get("data", {}).get("asks") or []
+    bid = float(bids[0][0]) if bids else 0.0
+    ask = float(asks[0][0]) if asks else 0.0
+    return bid, ask
+
+@ttl_cached
+async def fetch_bingx(client: httpx.AsyncClient, symbol: str) -> Tuple[float, float, int]:
     # Spot ticker; BingX commonly expects BTC-USDT style
     sym = to_bingx(symbol)
-    # Some deployments use /openApi/spot/market/ticker; others have a slightly different path.
-    # We try one, then fall back to another if needed.
-    try:
-        data = _get("https://open-api.bingx.com/openApi/spot/market/ticker", {"symbol": sym})
-    except Exception:
-        data = _get("https://open-api.bingx.com/openApi/market/ticker", {"symbol": sym})
-    # Many responses have shape {"code":0,"msg":"success","data":{"symbol":"BTC-USDT","askPrice":"...","bidPrice":"..."}}
-    d = data.get("data") or {}
-    # Some variants return a list; handle both
-    if isinstance(d, list) and d:
-        d = d[0]
-    bid = float(d.get("bidPrice") or d.get("bid") or d.get("bestBid") or 0.0)
-    ask = float(d.get("askPrice") or d.get("ask") or d.get("bestAsk") or 0.0)
-    if not bid or not ask:
-        # Try depth as last resort (top of book)
-        depth = _get("https://open-api.bingx.com/openApi/spot/market/depth", {"symbol": sym, "limit": 5})
-        bids = depth.get("data", {}).get("bids") or []
-        asks = depth.get("data", {}).get("asks") or []
-        if bids: bid = float(bids[0][0])
-        if asks: ask = float(asks[0][0])
+    if sym in _BINGX_FALLBACK:
+        bid, ask = await _bingx_depth(client, sym)
+    else:
+        # Some deployments use /openApi/spot/market/ticker; others have a slightly different path.
+        # We try one, then fall back to another if needed.
+        try:
+            data = await _get(client, "https://open-api.bingx.com/openApi/spot/market/ticker", {"symbol": sym})
+        except Exception:
+            data = await _get(client, "https://open-api.bingx.com/openApi/market/ticker", {"symbol": sym})
+        # Many responses have shape {"code":0,"msg":"success","data":{"symbol":"BTC-USDT","askPrice":"...","bidPrice":"..."}}
+        d = data.get("data") or {}
+        # Some variants return a list; handle both
+        if isinstance(d, list) and d:
+            d = d[0]
+        bid = float(d.get("bidPrice") or d.get("bid") or d.get("bestBid") or 0.0)
+        ask = float(d.get("askPrice") or d.get("ask") or d.get("bestAsk") or 0.0)
+        if not bid or not ask:
+            # Try depth as last resort (top of book), and remember it for this session
+            _BINGX_FALLBACK.add(sym)
+            depth_bid, depth_ask = await _bingx_depth(client, sym)
+            bid = depth_bid or bid
+            ask = depth_ask or ask
     ts = int(time.time() * 1000)
     if not bid or not ask:
         raise RuntimeError(f"BingX returned empty book for {sym}")
     return bid, ask, ts
 
+# --------- Snapshots (symbol -> quote for one sweep) ---------
+async def snapshot_binance(client: httpx.AsyncClient, symbols: List[str]) -> Dict[str, Quote]:
+    book = await fetch_binance_all(client)
+    return {s: book[to_binance(s)] for s in symbols if to_binance(s) in book}
+
+async def snapshot_bybit(client: httpx.AsyncClient, symbols: List[str]) -> Dict[str, Quote]:
+    # Linear (perp) category first; spot is only fetched for symbols it lacks
+    book = await fetch_bybit_all(client, "linear")
+    out = {s: book[to_bybit_linear(s)] for s in symbols if to_bybit_linear(s) in book}
+    missing = [s for s in symbols if s not in out]
+    if missing:
+        spot = await fetch_bybit_all(client, "spot")
+        out.update({s: spot[to_bybit_linear(s)] for s in missing if to_bybit_linear(s) in spot})
+    return out
+
+async def snapshot_bingx(client: httpx.AsyncClient, symbols: List[str]) -> Dict[str, Quote]:
+    # No all-symbols book ticker on BingX spot; query each symbol concurrently
+    results = await asyncio.gather(*(fetch_bingx(client, s) for s in symbols), return_exceptions=True)
+    return {s: r for s, r in zip(symbols, results) if not isinstance(r, Exception)}
+
 # Register exchanges here
 EXCHANGES = {
-    "binance": fetch_binance,
-    "bybit": fetch_bybit,
-    "bingx": fetch_bingx,
+    "binance": snapshot_binance,
+    "bybit": snapshot_bybit,
+    "bingx": snapshot_bingx,
 }
 
 # --------- Computation & formatting ---------
@@ -133,48 +218,75 @@ def fmt(x: Optional[float], width: int = 10) -> str:
         return " " * (width - 1) + "-"
     return f"{x:>{width}.2f}"
 
-def compare(symbols: List[str], ref: str) -> None:
+COLUMNS = ["SYMBOL", "EXCHANGE", "BID", "ASK", "MID", "SPR (bps)", "Δ vs REF (%)"]
+
+def render(table: List[list]) -> List[str]:
+    """Lay out [symbol, exchange, bid, ask, mid, spread_bps, delta_pct] rows."""
+    if tabulate is not None:
+        return [tabulate(table, headers=COLUMNS, floatfmt=".2f", missingval="-")]
+    header = f"{'SYMBOL':<10} {'EXCHANGE':<10} {'BID':>12} {'ASK':>12} {'MID':>12} {'SPR (bps)':>10} {'Δ vs REF (%)':>12}"
+    rule = "-" * len(header)
+    lines = [header, rule]
+    for i, (symN, name, bid, ask, mid, spread_bps, delta_pct) in enumerate(table):
+        if i and symN != table[i - 1][0]:
+            lines.append(rule)
+        lines.append(
+            f"{symN:<10} {name:<10} {fmt(bid,12)} {fmt(ask,12)} {fmt(mid,12)} "
+            f"{fmt(spread_bps,10)} {fmt(delta_pct,12)}"
+        )
+    lines.append(rule)
+    return lines
+
+async def compare(symbols: List[str], ref: str) -> None:
     ref = ref.lower()
     if ref not in EXCHANGES:
         raise SystemExit(f"--ref must be one of: {', '.join(EXCHANGES)}")
 
-    print(f"\nMarket Compare • symbols={symbols} • ref={ref}")
-    print("=" * 86)
-    header = f"{'SYMBOL':<10} {'EXCHANGE':<10} {'BID':>12} {'ASK':>12} {'MID':>12} {'SPR (bps)':>10} {'Δ vs REF (%)':>12}"
-    print(header)
-    print("-" * len(header))
+    # Output is buffered here and written to stdout in one go
+    out = [f"\nMarket Compare • symbols={symbols} • ref={ref}", "=" * 86]
+
+    # One snapshot per exchange covers every symbol; the exchanges are queried
+    # concurrently, so wall time is bounded by the slowest one.
+    syms = list(dict.fromkeys(norm(sym) for sym in symbols))
+    async with make_client() as client:
+        results = await asyncio.gather(
+            *(fn(client, syms) for fn in EXCHANGES.values()),
+            return_exceptions=True,
+        )
+    snaps = {name: ({} if isinstance(res, Exception) else res) for name, res in zip(EXCHANGES, results)}
 
-    for sym in symbols:
-        symN = norm(sym)
+    table = []
+
+    for symN in syms:
         # First collect all mids to compute deltas vs ref
         rows = []
         ref_mid: Optional[float] = None
-        for name, fn in EXCHANGES.items():
-            try:
-                bid, ask, ts = fn(symN)
-                mid = (bid + ask) / 2.0
-                spread_bps = bps((ask - bid) / mid) if mid else None
-                rows.append((name, bid, ask, mid, spread_bps))
-                if name == ref:
-                    ref_mid = mid
-            except Exception as e:
+        for name in EXCHANGES:
+            res = snaps[name].get(symN)
+            if res is None:
                 rows.append((name, None, None, None, None))
+                continue
+            bid, ask, ts = res
+            mid = (bid + ask) / 2.0
+            spread_bps = bps((ask - bid) / mid) if mid else None
+            rows.append((name, bid, ask, mid, spread_bps))
+            if name == ref:
+                ref_mid = mid
 
-        # Print, calculating deltas once we know ref_mid
+        # Calculate deltas once we know ref_mid
         for (name, bid, ask, mid, spread_bps) in rows:
             delta_pct = None
             if mid and ref_mid:
                 delta_pct = (mid / ref_mid - 1.0) * 100.0
-            print(
-                f"{symN:<10} {name:<10} {fmt(bid,12)} {fmt(ask,12)} {fmt(mid,12)} "
-                f"{fmt(spread_bps,10)} {fmt(delta_pct,12)}"
-            )
-        print("-" * len(header))
+            table.append([symN, name, bid, ask, mid, spread_bps, delta_pct])
+
+    out.extend(render(table))
 
-    print("Notes:")
-    print(" • SPR (bps) = (ask - bid) / mid * 10,000")
-    print(" • Δ vs REF compares each exchange's mid to the reference exchange mid")
-    print(" • If a row shows '-' values, that exchange's public endpoint returned no data or changed")
+    out.append("Notes:")
+    out.append(" • SPR (bps) = (ask - bid) / mid * 10,000")
+    out.append(" • Δ vs REF compares each exchange's mid to the reference exchange mid")
+    out.append(" • If a row shows '-' values, that exchange's public endpoint returned no data or changed")
+    sys.stdout.write("\n".join(out) + "\n")
 
 # --------- CLI ---------
 def main():
@@ -183,11 +295,7 @@ def main():
     p.add_argument("--ref", default="binance", choices=list(EXCHANGES.keys()), help="Reference exchange for Δ calculation")
     args = p.parse_args()
 
-    # Light rate-limit friendliness
-    try:
-        compare(args.symbols, ref=args.ref)
-    finally:
-        SESSION.close()
+    asyncio.run(compare(args.symbols, ref=args.ref))
 
 if __name__ == "__main__":
     main()
@@ -5,51 +5,478 @@ Menghubungkan Telegram bot dengan MCP server untuk akses multi-exchange
 """
 
 import asyncio
-import json
+import contextlib
+import functools
 import logging
-from typing import Dict, Any, Optional, List
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, Awaitable, Callable, Hashable, Iterator, Optional, List, Tuple
 import httpx
-from datetime import datetime
+import orjson
+
+try:
+    import h2  # noqa: F401  (pulled in by httpx[http2])
+except ImportError:  # h2 is optional, fall back to HTTP/1.1 pooling
+    h2 = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional, large bodies are then parsed in one go
+    ijson = None
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Display names per exchange, looked up instead of str.title() per message
+EXCHANGE_TITLES = {
+    "bybit": "Bybit",
+    "binance": "Binance",
+    "kucoin": "KuCoin",
+    "okx": "OKX",
+    "huobi": "Huobi",
+    "mexc": "MEXC",
+}
+EXCHANGE_SET = frozenset(EXCHANGE_TITLES)
+COIN_LIST = ("BTC", "ETH", "SOL", "ADA", "BNB", "XRP", "DOGE")
+
+# 24h change marker indexed by (change >= 0)
+_CHANGE_EMOJI = ("🔴", "🟢")
+
+# Query parsing, one linear scan each instead of per-token/per-coin loops
+COIN_RE = re.compile(rf"\b({'|'.join(COIN_LIST)})(?:-?usdt)?\b", re.IGNORECASE)
+EXCHANGE_RE = re.compile(rf"\b({'|'.join(EXCHANGE_TITLES)})\b", re.IGNORECASE)
+COMPARE_RE = re.compile(r"\b(compare|vs)\b", re.IGNORECASE)
+
+@functools.lru_cache(maxsize=512)
+def to_exchange_symbol(symbol: str, exchange: str) -> str:
+    """BTCUSDT -> format symbol yang dipakai exchange (BTC-USDT, btcusdt, ...)"""
+    if exchange in ("kucoin", "okx"):
+        return symbol.replace("USDT", "-USDT")
+    if exchange == "huobi":
+        return symbol.lower()
+    return symbol
+
+@functools.lru_cache(maxsize=512)
+def from_exchange_symbol(symbol: str) -> str:
+    """Format symbol exchange (BTC-USDT, btcusdt) -> BTCUSDT untuk display"""
+    return symbol.replace("-", "").upper()
+
+@functools.lru_cache(maxsize=64)
+def coin_to_symbol(coin: str) -> str:
+    """btc / BTC -> BTCUSDT"""
+    return f"{coin.upper()}USDT"
+
+# End-to-end deadline (time.monotonic() value) for MCP calls in this context
+DEADLINE: ContextVar[float] = ContextVar("deadline")
+TELEGRAM_REPLY_DEADLINE = 5.0  # seconds a Telegram reply may spend on MCP calls
+
+@contextlib.contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Bound every MCP call made inside the block to ``seconds`` from now
+    
+    Nested deadlines never extend an outer one.
+    """
+    expires = time.monotonic() + seconds
+    outer = DEADLINE.get(None)
+    token = DEADLINE.set(expires if outer is None else min(outer, expires))
+    try:
+        yield
+    finally:
+        DEADLINE.reset(token)
+
+def with_deadline(seconds: float):
+    """Decorator version of ``deadline`` for coroutine functions"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with deadline(seconds):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _time_left() -> Optional[float]:
+    """Seconds until the current DEADLINE, or None when none is set"""
+    expires = DEADLINE.get(None)
+    return None if expires is None else expires - time.monotonic()
+
+def _request_timeout() -> Dict[str, Any]:
+    """Per-request httpx kwargs that cap the timeout at the time left"""
+    left = _time_left()
+    if left is None:
+        return {}
+    return {"timeout": httpx.Timeout(left, connect=min(1.0, left))}
+
+def _can_wait(delay: float) -> bool:
+    left = _time_left()
+    return left is None or left > delay
+
+# Retry policy for idempotent GETs: exponential backoff with full jitter
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.2  # seconds
+RETRY_MAX_DELAY = 5.0  # seconds
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before the next attempt, honoring Retry-After when sent"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form, fall back to backoff
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+class CircuitBreaker:
+    """Fail-fast guard untuk satu backend: CLOSED -> OPEN -> HALF_OPEN -> CLOSED
+    
+    Setelah ``failure_threshold`` kegagalan berturut-turut circuit OPEN dan semua
+    request ditolak tanpa I/O. Setelah ``recovery_timeout`` detik satu request
+    percobaan (HALF_OPEN) diizinkan; sukses menutup circuit, gagal membukanya lagi.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+    
+    def before(self) -> bool:
+        """Return True if a request may go through right now"""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at >= self.recovery_timeout:
+            # Let one probe through per recovery window (a lost probe doesn't wedge us)
+            self.state = self.HALF_OPEN
+            self.opened_at = now
+            return True
+        return False
+    
+    def on_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+    
+    def on_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+# Cache lifetimes (seconds) for public endpoints; private ones are never cached
+TICKER_TTL = 2.0
+KLINE_TTL = 5.0
+ORDERBOOK_TTL = 1.0
+SERVER_TIME_TTL = 30.0
+API_DOCS_TTL = 3600.0
+
+# Orderbook depth above which the response body is parsed incrementally
+STREAM_DEPTH_THRESHOLD = 100
+
+class TTLCache:
+    """Async TTL cache dengan request coalescing
+    
+    Concurrent misses untuk key yang sama menunggu satu upstream call yang sama,
+    jadi N user yang bertanya "btc price" bersamaan hanya menghasilkan satu request.
+    Hanya response ``success`` yang disimpan.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+    
+    async def get_or_set(self, key: Hashable, coro_factory: Callable[[], Awaitable[Dict[str, Any]]],
+                         ttl: float) -> Dict[str, Any]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._store(key, t, ttl))
+        # Shield so one cancelled caller doesn't cancel the fetch for everyone
+        return await asyncio.shield(task)
+    
+    def _store(self, key: Hashable, task: asyncio.Task, ttl: float) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        if not value.get("success", False):
+            return
+        if len(self._data) >= self.maxsize:
+            now = time.monotonic()
+            for k in [k for k, (expires, _) in self._data.items() if expires <= now]:
+                del self._data[k]
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+        self._data[key] = (time.monotonic() + ttl, value)
+
+# Bulkhead: max in-flight requests per backend, so a slow exchange can't
+# hold more than ~20% of the shared pool (100 connections)
+BACKEND_CONCURRENCY = {"bybit": 20}
+DEFAULT_BACKEND_CONCURRENCY = 8
+
+def _breaker_key(endpoint: str) -> str:
+    """Backend key for an endpoint: '/bybit/...' -> 'bybit', '/exchanges/okx/...' -> 'exchanges/okx'"""
+    parts = endpoint.split("/")
+    if len(parts) > 2 and parts[1] == "exchanges":
+        return f"exchanges/{parts[2]}"
+    return parts[1] if len(parts) > 1 else ""
+
+# Connection pool shared by every MCPClient in the process
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None or _SHARED_CLIENT.is_closed:
+        _SHARED_CLIENT = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            # Multiplex concurrent fan-out calls over one connection
+            http2=h2 is not None,
+        )
+    return _SHARED_CLIENT
+
+async def close_shared_client() -> None:
+    """Close the process-wide AsyncClient (call once on shutdown)"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is not None:
+        await _SHARED_CLIENT.aclose()
+        _SHARED_CLIENT = None
+
+def _price_message(symbol: str, title: str, price: float, change_24h: float, volume_24h: float) -> str:
+    """Telegram reply for a single-exchange price"""
+    return "\n".join((
+        f"📊 **{symbol}** - {title}",
+        f"💰 Price: ${price:,.6f}",
+        f"{_CHANGE_EMOJI[change_24h >= 0]} 24h Change: {change_24h:+.2f}%",
+        f"📈 24h Volume: {volume_24h:,.2f}",
+    ))
+
+def parse_ticker(data: Dict[str, Any], exchange: str) -> Optional[Dict[str, float]]:
+    """Ambil price/change24h/volume dari response ticker MCP server"""
+    if not data.get("success", False):
+        return None
+    payload = data.get("data", {})
+    try:
+        if exchange == "bybit":
+            items = payload.get("result", {}).get("list") or []
+            if not items:
+                return None
+            t = items[0]
+            return {"price": float(t.get("lastPrice", 0)),
+                    "change24h": float(t.get("price24hPcnt", 0)) * 100,
+                    "volume": float(t.get("volume24h", 0))}
+        if exchange in ("binance", "mexc"):
+            t = payload[0] if isinstance(payload, list) and payload else payload
+            return {"price": float(t.get("lastPrice", 0)),
+                    "change24h": float(t.get("priceChangePercent", 0)),
+                    "volume": float(t.get("volume", 0))}
+        if exchange == "kucoin":
+            t = payload.get("data", payload)
+            return {"price": float(t.get("last", 0)),
+                    "change24h": float(t.get("changeRate", 0)) * 100,
+                    "volume": float(t.get("vol", 0))}
+        if exchange == "okx":
+            items = payload.get("data", payload) if isinstance(payload, dict) else payload
+            t = items[0] if isinstance(items, list) and items else items
+            last, open_24h = float(t.get("last", 0)), float(t.get("open24h", 0))
+            return {"price": last,
+                    "change24h": (last - open_24h) / open_24h * 100 if open_24h else 0.0,
+                    "volume": float(t.get("vol24h", 0))}
+        if exchange == "huobi":
+            t = payload.get("tick", payload)
+            close, open_ = float(t.get("close", 0)), float(t.get("open", 0))
+            return {"price": close,
+                    "change24h": (close - open_) / open_ * 100 if open_ else 0.0,
+                    "volume": float(t.get("amount", 0))}
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.warning(f"Cannot parse {exchange} ticker: {e}")
+    return None
+
 class MCPClient:
     """Client untuk berinteraksi dengan MCP Server"""
     
-    def __init__(self, mcp_base_url: str = "http://localhost:8001"):
+    def __init__(self, mcp_base_url: str = "http://localhost:8001",
+                 client: Optional[httpx.AsyncClient] = None, shared: bool = True):
         self.base_url = mcp_base_url
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        # Injected and shared clients are closed by whoever created them
+        self._owns_client = client is None and not shared
+        if client is not None:
+            self.http_client = client
+        elif shared:
+            self.http_client = get_shared_client()
+        else:
+            self.http_client = httpx.AsyncClient(timeout=30.0)
+        # One circuit breaker and one bulkhead semaphore per backend, see _breaker_key
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._sem: Dict[str, asyncio.Semaphore] = {}
+        self._cache = TTLCache()
+        
+        # exchange -> (ticker method, args builder from a BTCUSDT-style symbol)
+        self.ticker_dispatch: Dict[str, Tuple[Callable, Callable]] = {
+            "bybit": (self.get_bybit_tickers, lambda s: ("spot", s)),
+            "binance": (self.get_binance_ticker, lambda s: (s,)),
+            "kucoin": (self.get_kucoin_ticker, lambda s: (to_exchange_symbol(s, "kucoin"),)),
+            "okx": (self.get_okx_ticker, lambda s: (to_exchange_symbol(s, "okx"),)),
+            "huobi": (self.get_huobi_ticker, lambda s: (to_exchange_symbol(s, "huobi"),)),
+            "mexc": (self.get_mexc_ticker, lambda s: (s,)),
+        }
         
     async def close(self):
-        """Close HTTP client"""
-        await self.http_client.aclose()
+        """Close HTTP client if this instance owns it"""
+        if self._owns_client:
+            await self.http_client.aclose()
+    
+    def _get_backend(self, endpoint: str) -> Tuple[str, CircuitBreaker, asyncio.Semaphore]:
+        key = _breaker_key(endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker()
+            limit = BACKEND_CONCURRENCY.get(key.rpartition("/")[2], DEFAULT_BACKEND_CONCURRENCY)
+            self._sem[key] = asyncio.Semaphore(limit)
+        return key, breaker, self._sem[key]
     
     async def _make_request(self, endpoint: str, method: str = "GET", **kwargs) -> Dict[str, Any]:
         """Make HTTP request to MCP server"""
-        try:
-            url = f"{self.base_url}{endpoint}"
-            
-            if method.upper() == "GET":
-                response = await self.http_client.get(url, params=kwargs)
-            elif method.upper() == "POST":
-                response = await self.http_client.post(url, json=kwargs)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json()
+        method = method.upper()
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        if not _can_wait(0):
+            return {"success": False, "error": "deadline exceeded"}
+        
+        key, breaker, sem = self._get_backend(endpoint)
+        if not breaker.before():
+            return {"success": False, "error": f"Circuit open for {key or '/'}"}
+        
+        url = f"{self.base_url}{endpoint}"
+        # Only GETs are replayed; POST /bybit/order must never be sent twice
+        attempts = MAX_ATTEMPTS if method == "GET" else 1
+        
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            if not _can_wait(0):
+                return {"success": False, "error": "deadline exceeded"}
+            try:
+                async with sem:
+                    if method == "GET":
+                        response = await self.http_client.get(url, params=kwargs, **_request_timeout())
+                    else:
+                        response = await self.http_client.post(url, json=kwargs, **_request_timeout())
+                
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"{method} {url} -> {response.status_code} over {response.http_version}")
+                
+                response.raise_for_status()
+            except httpx.RequestError as e:
+                delay = _retry_delay(attempt)
+                if not last_attempt and _can_wait(delay):
+                    logger.warning(f"Request error to {url} (attempt {attempt + 1}/{attempts}): {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                if isinstance(e, httpx.TimeoutException) and not _can_wait(0):
+                    # Our own deadline ran out; that says nothing about backend health
+                    logger.warning(f"Deadline exceeded waiting for {url}")
+                    return {"success": False, "error": "deadline exceeded"}
+                breaker.on_failure()
+                logger.error(f"Request error to {url}: {e}")
+                return {"success": False, "error": f"Request failed: {str(e)}"}
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                delay = _retry_delay(attempt, e.response)
+                if status in RETRYABLE_STATUS and not last_attempt and _can_wait(delay):
+                    logger.warning(f"HTTP {status} from {url} (attempt {attempt + 1}/{attempts}), retrying")
+                    await asyncio.sleep(delay)
+                    continue
+                # 4xx means the backend is up and answering; only 429/5xx count as failures
+                if status == 429 or status >= 500:
+                    breaker.on_failure()
+                else:
+                    breaker.on_success()
+                logger.error(f"HTTP error {status} from {url}")
+                return {"success": False, "error": f"HTTP {status}: {e.response.text}"}
             
+            breaker.on_success()
+            try:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Invalid JSON from {url}: {e}")
+                return {"success": False, "error": f"Invalid JSON response: {e}"}
+    
+    async def _make_request_streamed(self, endpoint: str, projections: Dict[str, str],
+                                     **kwargs) -> Dict[str, Any]:
+        """GET endpoint dan parse body secara incremental dengan ijson
+        
+        Hanya item di bawah prefix ``projections`` (nama -> ijson prefix) yang
+        disimpan, jadi dokumen besar tidak pernah dimaterialisasi utuh di memory.
+        """
+        if not _can_wait(0):
+            return {"success": False, "error": "deadline exceeded"}
+        key, breaker, sem = self._get_backend(endpoint)
+        if not breaker.before():
+            return {"success": False, "error": f"Circuit open for {key or '/'}"}
+        
+        url = f"{self.base_url}{endpoint}"
+        projected: Dict[str, List[Any]] = {name: ijson.sendable_list() for name in projections}
+        # The MCP envelope is read alongside, so server-side errors aren't mistaken for empty data
+        envelope: Dict[str, List[Any]] = {"success": ijson.sendable_list(), "error": ijson.sendable_list()}
+        parsers = [ijson.items_coro(projected[name], prefix, use_float=True)
+                   for name, prefix in projections.items()]
+        parsers += [ijson.items_coro(target, name) for name, target in envelope.items()]
+        try:
+            async with sem, self.http_client.stream("GET", url, params=kwargs, **_request_timeout()) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    for parser in parsers:
+                        parser.send(chunk)
+            for parser in parsers:
+                parser.close()
         except httpx.RequestError as e:
+            if isinstance(e, httpx.TimeoutException) and not _can_wait(0):
+                # Our own deadline ran out; that says nothing about backend health
+                logger.warning(f"Deadline exceeded waiting for {url}")
+                return {"success": False, "error": "deadline exceeded"}
+            breaker.on_failure()
             logger.error(f"Request error to {url}: {e}")
             return {"success": False, "error": f"Request failed: {str(e)}"}
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code} from {url}")
-            return {"success": False, "error": f"HTTP {e.response.status_code}: {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            return {"success": False, "error": str(e)}
+            status = e.response.status_code
+            if status == 429 or status >= 500:
+                breaker.on_failure()
+            else:
+                breaker.on_success()
+            logger.error(f"HTTP error {status} from {url}")
+            return {"success": False, "error": f"HTTP {status}"}
+        except ijson.JSONError as e:
+            breaker.on_success()
+            logger.error(f"Invalid JSON from {url}: {e}")
+            return {"success": False, "error": f"Invalid JSON response: {e}"}
+        
+        breaker.on_success()
+        if envelope["success"] and envelope["success"][0] is False:
+            error = envelope["error"][0] if envelope["error"] else "MCP server reported failure"
+            return {"success": False, "error": error}
+        return {"success": True, **projected}
+    
+    async def _cached_request(self, ttl: float, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """GET a public endpoint through the TTL cache"""
+        key = (endpoint, tuple(sorted(kwargs.items())))
+        return await self._cache.get_or_set(key, lambda: self._make_request(endpoint, **kwargs), ttl)
     
     # === SERVER INFO ===
     
@@ -64,18 +491,28 @@ class MCPClient:
         params = {"category": category}
         if symbol:
             params["symbol"] = symbol
-        return await self._make_request("/bybit/tickers", **params)
+        return await self._cached_request(TICKER_TTL, "/bybit/tickers", **params)
     
     async def get_bybit_kline(self, category: str, symbol: str, interval: str = "1", limit: int = 5) -> Dict[str, Any]:
         """Get Bybit kline/candlestick data"""
-        return await self._make_request("/bybit/kline", 
-                                      category=category, symbol=symbol, 
-                                      interval=interval, limit=limit)
+        return await self._cached_request(KLINE_TTL, "/bybit/kline",
+                                          category=category, symbol=symbol, 
+                                          interval=interval, limit=limit)
     
     async def get_bybit_orderbook(self, category: str, symbol: str, limit: int = 10) -> Dict[str, Any]:
         """Get Bybit order book data"""
-        return await self._make_request("/bybit/orderbook", 
-                                      category=category, symbol=symbol, limit=limit)
+        if limit > STREAM_DEPTH_THRESHOLD and ijson is not None:
+            # Deep books: keep only the bid/ask levels, never the whole document
+            levels = await self._make_request_streamed(
+                "/bybit/orderbook",
+                {"a": "data.result.a.item", "b": "data.result.b.item"},
+                category=category, symbol=symbol, limit=limit,
+            )
+            if not levels["success"]:
+                return levels
+            return {"success": True, "data": {"result": {"s": symbol, "a": levels["a"], "b": levels["b"]}}}
+        return await self._cached_request(ORDERBOOK_TTL, "/bybit/orderbook",
+                                          category=category, symbol=symbol, limit=limit)
     
     async def get_bybit_recent_trades(self, category: str, symbol: str, limit: int = 5) -> Dict[str, Any]:
         """Get Bybit recent trade data"""
@@ -91,7 +528,7 @@ class MCPClient:
     
     async def get_bybit_server_time(self) -> Dict[str, Any]:
         """Get Bybit server time"""
-        return await self._make_request("/bybit/server-time")
+        return await self._cached_request(SERVER_TIME_TTL, "/bybit/server-time")
     
     # === BYBIT PRIVATE ENDPOINTS ===
     
@@ -127,41 +564,76 @@ class MCPClient:
         params = {}
         if symbol:
             params["symbol"] = symbol
-        return await self._make_request("/exchanges/binance/ticker", **params)
+        return await self._cached_request(TICKER_TTL, "/exchanges/binance/ticker", **params)
     
     async def get_kucoin_ticker(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """Get KuCoin ticker information"""  
         params = {}
         if symbol:
             params["symbol"] = symbol
-        return await self._make_request("/exchanges/kucoin/ticker", **params)
+        return await self._cached_request(TICKER_TTL, "/exchanges/kucoin/ticker", **params)
     
     async def get_okx_ticker(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """Get OKX ticker information"""
         params = {}
         if symbol:
             params["symbol"] = symbol
-        return await self._make_request("/exchanges/okx/ticker", **params)
+        return await self._cached_request(TICKER_TTL, "/exchanges/okx/ticker", **params)
     
     async def get_huobi_ticker(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """Get Huobi ticker information"""
         params = {}
         if symbol:
             params["symbol"] = symbol
-        return await self._make_request("/exchanges/huobi/ticker", **params)
+        return await self._cached_request(TICKER_TTL, "/exchanges/huobi/ticker", **params)
     
     async def get_mexc_ticker(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """Get MEXC ticker information"""
         params = {}
         if symbol:
             params["symbol"] = symbol
-        return await self._make_request("/exchanges/mexc/ticker", **params)
+        return await self._cached_request(TICKER_TTL, "/exchanges/mexc/ticker", **params)
     
     async def compare_exchange_prices(self, symbol: str, exchanges: str = "bybit,binance,kucoin") -> Dict[str, Any]:
         """Compare prices across multiple exchanges"""
         return await self._make_request("/exchanges/compare-prices", 
                                       symbol=symbol, exchanges=exchanges)
     
+    async def get_ticker(self, exchange: str, symbol: str) -> Dict[str, Any]:
+        """Get ticker dari satu exchange dengan format symbol yang sesuai"""
+        entry = self.ticker_dispatch.get(exchange)
+        if entry is None:
+            return {"success": False, "error": f"Unsupported exchange: {exchange}"}
+        fn, argfn = entry
+        return await fn(*argfn(symbol))
+    
+    async def compare_exchange_prices_parallel(self, symbol: str, exchanges: str = "bybit,binance,kucoin") -> Dict[str, Any]:
+        """Compare prices dengan request ticker ke semua exchange secara concurrent
+        
+        Hasilnya memakai shape ``exchanges`` yang sama dengan ``compare_exchange_prices``
+        sehingga bisa langsung dipakai oleh ``format_comparison_response``.
+        """
+        names = [name for name in exchanges.split(",") if name in EXCHANGE_SET]
+        results = await asyncio.gather(
+            *(self.get_ticker(name, symbol) for name in names),
+            return_exceptions=True,
+        )
+        
+        prices: Dict[str, Any] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Ticker {name} {symbol} failed: {result}")
+                prices[name] = {"error": str(result)}
+                continue
+            ticker = parse_ticker(result, name)
+            prices[name] = ticker if ticker is not None else {"error": result.get("error", "No data")}
+        
+        if not any("price" in p for p in prices.values()):
+            return {"success": False, "symbol": symbol, "error": "No exchange returned a price"}
+        
+        # Analysis (min/max/avg/spread) is derived by format_comparison_response
+        return {"success": True, "symbol": symbol, "exchanges": prices}
+    
     # === DOCUMENTATION ===
     
     async def get_api_docs(self, section: Optional[str] = None) -> Dict[str, Any]:
@@ -169,13 +641,28 @@ class MCPClient:
         params = {}
         if section:
             params["section"] = section
-        return await self._make_request("/api-docs", **params)
+        return await self._cached_request(API_DOCS_TTL, "/api-docs", **params)
 
 class TelegramMCPIntegration:
     """Integration layer antara Telegram bot dan MCP client"""
     
     def __init__(self, mcp_client: MCPClient):
         self.mcp_client = mcp_client
+        self._dispatch = mcp_client.ticker_dispatch
+        # Rendered replies keyed by (exchange(s), symbol) -> (expires_at, text)
+        self._fmt_cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    
+    def _cached_reply(self, key: Tuple[str, str]) -> Optional[str]:
+        entry = self._fmt_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+    
+    def _store_reply(self, key: Tuple[str, str], data: Dict[str, Any], text: str) -> str:
+        # Error replies are not cached so the next query retries upstream
+        if data.get("success", False):
+            self._fmt_cache[key] = (time.monotonic() + TICKER_TTL, text)
+        return text
     
     async def format_price_response(self, data: Dict[str, Any], exchange: str = "bybit") -> str:
         """Format price data untuk response Telegram"""
@@ -193,14 +680,7 @@ class TelegramMCPIntegration:
                     change_24h = float(ticker.get("price24hPcnt", 0)) * 100
                     volume_24h = float(ticker.get("volume24h", 0))
                     
-                    change_emoji = "🟢" if change_24h >= 0 else "🔴"
-                    
-                    return f"""
-📊 **{symbol}** - Bybit
-💰 Price: ${price:,.6f}
-{change_emoji} 24h Change: {change_24h:+.2f}%
-📈 24h Volume: {volume_24h:,.2f}
-                    """.strip()
+                    return _price_message(symbol, "Bybit", price, change_24h, volume_24h)
             
             elif exchange in ["binance", "mexc"]:
                 # Format Binance/MEXC response
@@ -213,14 +693,7 @@ class TelegramMCPIntegration:
                 change_24h = float(ticker_data.get("priceChangePercent", 0))
                 volume_24h = float(ticker_data.get("volume", 0))
                 
-                change_emoji = "🟢" if change_24h >= 0 else "🔴"
-                
-                return f"""
-📊 **{symbol}** - {exchange.title()}
-💰 Price: ${price:,.6f}
-{change_emoji} 24h Change: {change_24h:+.2f}%
-📈 24h Volume: {volume_24h:,.2f}
-                """.strip()
+                return _price_message(symbol, EXCHANGE_TITLES[exchange], price, change_24h, volume_24h)
             
             elif exchange == "kucoin":
                 # Format KuCoin response
@@ -228,23 +701,16 @@ class TelegramMCPIntegration:
                 if "data" in ticker_data:
                     ticker_data = ticker_data["data"]
                 
-                symbol = ticker_data.get("symbol", "Unknown")
+                symbol = from_exchange_symbol(ticker_data["symbol"]) if "symbol" in ticker_data else "Unknown"
                 price = float(ticker_data.get("last", 0))
                 change_24h = float(ticker_data.get("changeRate", 0)) * 100
                 volume_24h = float(ticker_data.get("vol", 0))
                 
-                change_emoji = "🟢" if change_24h >= 0 else "🔴"
-                
-                return f"""
-📊 **{symbol}** - KuCoin
-💰 Price: ${price:,.6f}
-{change_emoji} 24h Change: {change_24h:+.2f}%
-📈 24h Volume: {volume_24h:,.2f}
-                """.strip()
+                return _price_message(symbol, "KuCoin", price, change_24h, volume_24h)
+            
+            # Unknown exchange (or empty Bybit list): show the raw payload
+            return f"✅ Data received from {exchange}:\n```json\n{orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()}\n```"
             
-            else:
-                return f"✅ Data received from {exchange}:\n```json\n{json.dumps(data, indent=2)}\n```"
-                
         except Exception as e:
             return f"❌ Error formatting {exchange} data: {str(e)}"
     
@@ -256,94 +722,90 @@ class TelegramMCPIntegration:
             
             symbol = data.get("symbol", "Unknown")
             exchanges = data.get("exchanges", {})
-            analysis = data.get("analysis", {})
             
-            response = f"💹 **Price Comparison for {symbol}**\n\n"
+            parts = [f"💹 **Price Comparison for {symbol}**\n\n"]
             
-            # Exchange prices
+            # Exchange prices, with min/max/sum gathered in the same pass
+            lo = hi = acc = 0.0
+            n = 0
             for exchange, price_data in exchanges.items():
+                title = EXCHANGE_TITLES.get(exchange, exchange)
                 if isinstance(price_data, dict) and "price" in price_data:
                     price = price_data["price"]
                     change = price_data.get("change24h", 0)
-                    change_emoji = "🟢" if change >= 0 else "🔴"
+                    change_emoji = _CHANGE_EMOJI[change >= 0]
+                    parts.append(f"**{title}**: ${price:,.6f} {change_emoji}{change:+.2f}%\n")
                     
-                    response += f"**{exchange.title()}**: ${price:,.6f} {change_emoji}{change:+.2f}%\n"
+                    if n == 0 or price < lo:
+                        lo = price
+                    if n == 0 or price > hi:
+                        hi = price
+                    acc += price
+                    n += 1
                 else:
-                    response += f"**{exchange.title()}**: ❌ Error\n"
+                    # Failed or circuit-open exchanges don't sink the whole comparison
+                    parts.append(f"**{title}**: ⚠️ unavailable\n")
             
-            # Analysis
-            if analysis:
-                min_price = analysis.get("min_price", 0)
-                max_price = analysis.get("max_price", 0)
-                spread_percent = analysis.get("spread_percent", 0)
-                avg_price = analysis.get("avg_price", 0)
-                
-                response += f"\n📊 **Analysis:**\n"
-                response += f"🔻 Lowest: ${min_price:,.6f}\n"
-                response += f"🔺 Highest: ${max_price:,.6f}\n"
-                response += f"📏 Spread: {spread_percent:.4f}%\n"
-                response += f"📊 Average: ${avg_price:,.6f}\n"
+            failed = len(exchanges) - n
+            if failed:
+                parts.append(f"\n⚠️ {failed} of {len(exchanges)} exchanges unavailable, showing partial data\n")
+            
+            # Analysis over healthy exchanges only; a spread needs two prices
+            if n >= 2:
+                spread_percent = (hi - lo) / lo * 100 if lo else 0.0
+                parts.append(
+                    f"\n📊 **Analysis:**\n"
+                    f"🔻 Lowest: ${lo:,.6f}\n"
+                    f"🔺 Highest: ${hi:,.6f}\n"
+                    f"📏 Spread: {spread_percent:.4f}%\n"
+                    f"📊 Average: ${acc / n:,.6f}\n"
+                )
+            else:
+                parts.append("\n📊 **Analysis:** insufficient data\n")
             
-            return response
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error formatting comparison: {str(e)}"
     
+    @with_deadline(TELEGRAM_REPLY_DEADLINE)
     async def handle_price_query(self, query: str) -> str:
         """Handle price queries dari Telegram"""
         try:
             # Parse query untuk extract symbol dan exchange
-            parts = query.lower().split()
-            symbol = "BTCUSDT"  # default
-            exchange = "bybit"  # default
-            
-            # Extract symbol
-            for part in parts:
-                if any(coin in part.upper() for coin in ["BTC", "ETH", "SOL", "ADA"]):
-                    if "USDT" not in part.upper():
-                        symbol = f"{part.upper()}USDT"
-                    else:
-                        symbol = part.upper()
-                    break
-            
-            # Extract exchange
-            for part in parts:
-                if part in ["bybit", "binance", "kucoin", "okx", "huobi", "mexc"]:
-                    exchange = part
-                    break
+            coin_match = COIN_RE.search(query)
+            symbol = coin_to_symbol(coin_match.group(1)) if coin_match else "BTCUSDT"
+            exchange_match = EXCHANGE_RE.search(query)
+            exchange = exchange_match.group(1).lower() if exchange_match else "bybit"
             
             # Special handling for comparison
-            if "compare" in query.lower() or "vs" in query.lower():
+            if COMPARE_RE.search(query):
                 exchanges = "bybit,binance,kucoin"
                 if "binance" in query.lower():
                     exchanges = "bybit,binance"
                 
-                data = await self.mcp_client.compare_exchange_prices(symbol, exchanges)
-                return await self.format_comparison_response(data)
+                key = (exchanges, symbol)
+                cached = self._cached_reply(key)
+                if cached is not None:
+                    return cached
+                data = await self.mcp_client.compare_exchange_prices_parallel(symbol, exchanges)
+                return self._store_reply(key, data, await self.format_comparison_response(data))
             
-            # Single exchange query
-            if exchange == "bybit":
-                data = await self.mcp_client.get_bybit_tickers("spot", symbol)
-            elif exchange == "binance":
-                data = await self.mcp_client.get_binance_ticker(symbol)
-            elif exchange == "kucoin":
-                # Convert BTCUSDT to BTC-USDT for KuCoin
-                kucoin_symbol = symbol.replace("USDT", "-USDT")
-                data = await self.mcp_client.get_kucoin_ticker(kucoin_symbol)
-            elif exchange == "okx":
-                # Convert BTCUSDT to BTC-USDT for OKX
-                okx_symbol = symbol.replace("USDT", "-USDT")
-                data = await self.mcp_client.get_okx_ticker(okx_symbol)
-            elif exchange == "mexc":
-                data = await self.mcp_client.get_mexc_ticker(symbol)
-            else:
-                data = await self.mcp_client.get_bybit_tickers("spot", symbol)
+            key = (exchange, symbol)
+            cached = self._cached_reply(key)
+            if cached is not None:
+                return cached
+            
+            # Single exchange query, unknown exchanges fall back to Bybit
+            fn, argfn = self._dispatch.get(exchange, self._dispatch["bybit"])
+            data = await fn(*argfn(symbol))
             
-            return await self.format_price_response(data, exchange)
+            return self._store_reply(key, data, await self.format_price_response(data, exchange))
             
         except Exception as e:
             return f"❌ Error processing query: {str(e)}"
     
+    @with_deadline(TELEGRAM_REPLY_DEADLINE)
     async def handle_balance_query(self) -> str:
         """Handle balance queries dari Telegram"""
         try:
@@ -359,9 +821,11 @@ class TelegramMCPIntegration:
                 total_equity = float(account.get("totalEquity", 0))
                 total_wallet_balance = float(account.get("totalWalletBalance", 0))
                 
-                response = f"💰 **Wallet Balance**\n"
-                response += f"Total Equity: ${total_equity:,.2f}\n"
-                response += f"Total Balance: ${total_wallet_balance:,.2f}\n\n"
+                parts = [
+                    "💰 **Wallet Balance**\n",
+                    f"Total Equity: ${total_equity:,.2f}\n",
+                    f"Total Balance: ${total_wallet_balance:,.2f}\n\n",
+                ]
                 
                 # Coin details
                 coins = account.get("coin", [])
@@ -369,9 +833,9 @@ class TelegramMCPIntegration:
                     coin_name = coin.get("coin", "")
                     wallet_balance = float(coin.get("walletBalance", 0))
                     if wallet_balance > 0:
-                        response += f"**{coin_name}**: {wallet_balance:,.6f}\n"
+                        parts.append(f"**{coin_name}**: {wallet_balance:,.6f}\n")
                 
-                return response
+                return "".join(parts)
             
             return "ℹ️ No balance data found"
             
@@ -388,7 +852,7 @@ async def test_mcp_integration():
         # Test server info
         print("=== Server Info ===")
         server_info = await mcp_client.get_server_info()
-        print(json.dumps(server_info, indent=2))
+        print(orjson.dumps(server_info, option=orjson.OPT_INDENT_2).decode())
         
         # Test price query
         print("\n=== Price Query ===")
@@ -402,6 +866,7 @@ async def test_mcp_integration():
         
     finally:
         await mcp_client.close()
+        await close_shared_client()
 
 if __name__ == "__main__":
     asyncio.run(test_mcp_integration())
\ No newline at end of file
@@ -4,8 +4,10 @@ Debug script untuk melihat raw LLM responses
 """
 
 import asyncio
+import hashlib
 import sys
 import os
+from functools import lru_cache
 
 # Add src to path (project root/src)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -13,21 +15,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from config import get_config
 from llm import ZaiClient
 
-async def debug_llm_responses():
-    """Debug raw LLM responses untuk trading queries"""
-    print("🔍 Debugging LLM Responses...")
-    
-    # Initialize LLM client
-    config = get_config()
-    llm_client = ZaiClient(
-        api_key=config.zai_api_key,
-        base_url=config.zai_base_url,
-        default_model=config.llm_model,
-        temperature=config.llm_temperature,
-        max_tokens=config.llm_max_tokens,
-    )
-    
-    system_prompt = """You are an advanced cryptocurrency trading assistant with access to real-time market data from multiple exchanges.
+SYSTEM_PROMPT = """You are an advanced cryptocurrency trading assistant with access to real-time market data from multiple exchanges.
 
 IMPORTANT: You MUST use the available tools to get real-time data. Do NOT provide fake or outdated prices.
 
@@ -61,32 +49,62 @@ Parameters: {"symbol": "string", "count": "integer"}
 
 REMEMBER: Always use tools for real data. Never provide fake prices or outdated information.
 """
+SYSTEM_PROMPT_HASH = hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> ZaiClient:
+    """Build the LLM client once per process"""
+    config = get_config()
+    return ZaiClient(
+        api_key=config.zai_api_key,
+        base_url=config.zai_base_url,
+        default_model=config.llm_model,
+        temperature=config.llm_temperature,
+        max_tokens=config.llm_max_tokens,
+    )
+
+
+@lru_cache(maxsize=128)
+def cached_chat(sys_hash: str, query: str) -> str:
+    """Chat completion memoized on (system prompt hash, query)"""
+    return get_llm_client().chat(
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        temperature=0.3,
+        max_tokens=1024,
+        prompt_cache_key=sys_hash,
+    )
+
+async def debug_llm_responses():
+    """Debug raw LLM responses untuk trading queries"""
+    print("🔍 Debugging LLM Responses...")
     
     test_queries = [
         "What's the price of Bitcoin?",
         "Show me BTC prices on top 5 exchanges"
     ]
     
-    for query in test_queries:
+    # Fire all queries concurrently, at most 5 in flight
+    sem = asyncio.Semaphore(5)
+    
+    async def run(query):
+        async with sem:
+            return await asyncio.to_thread(cached_chat, SYSTEM_PROMPT_HASH, query)
+    
+    responses = await asyncio.gather(*map(run, test_queries), return_exceptions=True)
+    
+    for query, response in zip(test_queries, responses):
         print(f"\n💬 Query: {query}")
         print("-" * 50)
         
-        try:
-            response = await asyncio.to_thread(
-                llm_client.chat,
-                [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": query}
-                ],
-                temperature=0.3,
-                max_tokens=1024
-            )
-            
+        if isinstance(response, Exception):
+            print(f"❌ Error: {str(response)}")
+        else:
             print(f"🤖 Raw Response:\n{repr(response)}")
             print(f"\n📝 Formatted Response:\n{response}")
-            
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
         
         print("\n" + "="*60)
 
@@ -17,6 +17,8 @@ from bybit_client import BybitClient, BybitConfig
 from natural_trading_assistant import TradingToolsRegistry
 from natural_language_processor import NaturalTradingProcessor
 
+LLM_TIMEOUT = 60.0  # seconds to wait for the LLM reply
+
 async def debug_specific_query():
     """Debug specific problematic query"""
     print("🔍 Debugging Specific Query...")
@@ -38,8 +40,7 @@ async def debug_specific_query():
     print("-" * 50)
     
     try:
-        response = await asyncio.to_thread(
-            llm_client.chat,
+        response = await asyncio.wait_for(llm_client.achat(
             [
                 {"role": "system", "content": """You are a cryptocurrency trading assistant. For trading queries, respond with JSON tool calls.
 
@@ -62,11 +63,13 @@ Response format:
             ],
             temperature=0.3,
             max_tokens=800
-        )
+        ), timeout=LLM_TIMEOUT)
         
         print(f"🤖 Raw Response:\n{repr(response)}")
         print(f"\n📝 Formatted Response:\n{response}")
         
+    except asyncio.TimeoutError:
+        print(f"❌ Error: LLM did not answer within {LLM_TIMEOUT:.0f}s")
     except Exception as e:
         print(f"❌ Error: {str(e)}")
 
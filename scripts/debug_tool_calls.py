@@ -4,8 +4,14 @@ Debug tool calls parsing
 """
 
 import asyncio
+import hashlib
+import json
+import re
 import sys
 import os
+from functools import lru_cache
+
+import orjson
 
 # Add src to path (project root/src)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -13,21 +19,25 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from config import get_config
 from llm import ZaiClient
 
-async def debug_tool_calls():
-    """Debug tool calls responses"""
-    print("🔍 Debugging Tool Calls...")
-    
-    # Initialize LLM client
-    config = get_config()
-    llm_client = ZaiClient(
-        api_key=config.zai_api_key,
-        base_url=config.zai_base_url,
-        default_model=config.llm_model,
-        temperature=0.3,
-        max_tokens=800
-    )
-    
-    system_prompt = """You are a cryptocurrency trading assistant with access to real-time market data tools.
+# JSON extraction pattern, compiled once
+JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+
+def find_json(s: str):
+    """Return the first decodable JSON object in s, scanning each '{' once"""
+    i = 0
+    while True:
+        i = s.find('{', i)
+        if i < 0:
+            return None
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(s, i)
+            return obj
+        except json.JSONDecodeError:
+            i += 1
+
+SYSTEM_PROMPT = """You are a cryptocurrency trading assistant with access to real-time market data tools.
 
 IMPORTANT: For ANY price or trading query, you MUST respond with JSON tool calls. DO NOT provide fake data.
 
@@ -53,6 +63,38 @@ Examples:
 
 For general chat (non-trading), respond normally without tools.
 """
+SYSTEM_PROMPT_HASH = hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> ZaiClient:
+    """Build the LLM client once per process"""
+    config = get_config()
+    return ZaiClient(
+        api_key=config.zai_api_key,
+        base_url=config.zai_base_url,
+        default_model=config.llm_model,
+        temperature=0.3,
+        max_tokens=800
+    )
+
+
+@lru_cache(maxsize=128)
+def cached_chat(sys_hash: str, query: str) -> str:
+    """Chat completion memoized on (system prompt hash, query)"""
+    return get_llm_client().chat(
+        [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        temperature=0.3,
+        max_tokens=800,
+        prompt_cache_key=sys_hash,
+    )
+
+async def debug_tool_calls():
+    """Debug tool calls responses"""
+    print("🔍 Debugging Tool Calls...")
     
     query = "What's the price of Bitcoin?"
     
@@ -61,45 +103,31 @@ For general chat (non-trading), respond normally without tools.
     
     try:
         response = await asyncio.to_thread(
-            llm_client.chat,
-            [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ],
-            temperature=0.3,
-            max_tokens=800
+            cached_chat, SYSTEM_PROMPT_HASH, query
         )
         
         print(f"🤖 Raw Response:\n{repr(response)}")
         print(f"\n📝 Formatted Response:\n{response}")
         
         # Test JSON parsing
-        import re
-        import json
-        
         print(f"\n🔍 JSON Parsing Tests:")
         
         # Method 1: Look for ```json blocks
-        json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
+        json_match = JSON_BLOCK_RE.search(response)
         if json_match:
             print(f"✅ Found JSON block: {json_match.group(1)}")
             try:
-                parsed = json.loads(json_match.group(1))
+                parsed = orjson.loads(json_match.group(1))
                 print(f"✅ Successfully parsed: {parsed}")
-            except Exception as e:
+            except orjson.JSONDecodeError as e:
                 print(f"❌ JSON parse error: {e}")
         else:
             print("❌ No ```json block found")
         
         # Method 2: Look for any JSON object
-        json_match2 = re.search(r'{.*}', response, re.DOTALL)
-        if json_match2:
-            print(f"✅ Found JSON object: {json_match2.group(0)}")
-            try:
-                parsed = json.loads(json_match2.group(0))
-                print(f"✅ Successfully parsed: {parsed}")
-            except Exception as e:
-                print(f"❌ JSON parse error: {e}")
+        parsed = find_json(response)
+        if parsed is not None:
+            print(f"✅ Successfully parsed: {parsed}")
         else:
             print("❌ No JSON object found")
         
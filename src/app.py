@@ -1,14 +1,68 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import httpx
 from fastapi import FastAPI
-import requests
-app = FastAPI()
+from fastapi.responses import ORJSONResponse
+
+BYBIT_TICKERS_URL = "https://api.bybit.com/v5/market/tickers"
+
+TICKER_TTL = 1.0  # seconds a /ticker response is served from memory
+TICKER_CACHE_SIZE = 512
+
+# symbol -> (expires_at, payload), least recently used first
+_ticker_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+# symbol -> upstream fetch shared by concurrent cache misses
+_ticker_inflight: "dict[str, asyncio.Task]" = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled keep-alive client for all requests to api.bybit.com
+    app.state.client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=5.0,
+    )
+    try:
+        yield
+    finally:
+        await app.state.client.aclose()
+
+
+# Ticker payloads are serialized with orjson instead of stdlib json
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
-@app.get("/ticker/{symbol}")
-def ticker(symbol: str):
-    r = requests.get("https://api.bybit.com/v5/market/tickers",
-                     params={"category":"linear","symbol":symbol})
+
+async def _fetch_ticker(symbol: str) -> dict:
+    r = await app.state.client.get(BYBIT_TICKERS_URL,
+                                   params={"category": "linear", "symbol": symbol})
     r.raise_for_status()
-    return r.json()
+    payload = r.json()
+    _ticker_cache[symbol] = (time.monotonic() + TICKER_TTL, payload)
+    _ticker_cache.move_to_end(symbol)
+    if len(_ticker_cache) > TICKER_CACHE_SIZE:
+        _ticker_cache.popitem(last=False)
+    return payload
+
+
+@app.get("/ticker/{symbol}")
+async def ticker(symbol: str):
+    entry = _ticker_cache.get(symbol)
+    if entry is not None and entry[0] > time.monotonic():
+        _ticker_cache.move_to_end(symbol)
+        return entry[1]
+
+    # Single flight: concurrent misses for a symbol await the same request
+    task = _ticker_inflight.get(symbol)
+    if task is None:
+        task = asyncio.create_task(_fetch_ticker(symbol))
+        _ticker_inflight[symbol] = task
+        task.add_done_callback(lambda _: _ticker_inflight.pop(symbol, None))
+    return await asyncio.shield(task)
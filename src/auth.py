@@ -1,9 +1,26 @@
 from __future__ import annotations
 
-import json
+import atexit
+import mmap
+from array import array
+from bisect import bisect_left, insort
+from contextlib import contextmanager
 import os
+import threading
 from dataclasses import dataclass
-from typing import Set
+from typing import Iterator, List, Optional, Set
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # no flock on Windows; flushes are then only serialised in-process
+    fcntl = None
+
+# Seconds to coalesce authenticate/logout bursts into a single file write
+FLUSH_DELAY = 0.5
+# Store files at least this big are parsed straight from a memory map
+MMAP_MIN_SIZE = 1 << 20
 
 
 @dataclass
@@ -17,45 +34,143 @@ class AuthStore:
     def __init__(self, cfg: AuthConfig):
         self.cfg = cfg
         self._path = cfg.store_path
-        self._authed: Set[int] = set()
+        # Sorted int64 user ids: 8 bytes each, and already in save order
+        self._authed = array("q")
+        self._lock = threading.Lock()
+        # Changes not yet flushed; replayed over the file so other processes' edits survive
+        self._added: Set[int] = set()
+        self._removed: Set[int] = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        # st_mtime_ns of the store as last loaded or written by this process
+        self._mtime_ns = 0
         self._ensure_dir()
         self._load()
+        # Don't lose a pending write on interpreter exit
+        atexit.register(self.flush)
 
     def _ensure_dir(self):
         d = os.path.dirname(self._path)
         if d and not os.path.exists(d):
             os.makedirs(d, exist_ok=True)
 
-    def _load(self):
-        if not os.path.exists(self._path):
-            return
+    def _read_ids(self) -> Optional[List[int]]:
+        # Sorted ids currently in the store file, or None if there is no file yet
         try:
-            with open(self._path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            st = os.stat(self._path)
+        except OSError:
+            return None
+        self._mtime_ns = st.st_mtime_ns
+        try:
+            with open(self._path, "rb") as f:
+                if st.st_size >= MMAP_MIN_SIZE:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                        data = orjson.loads(view)
+                else:
+                    data = orjson.loads(f.read())
             ids = data.get("user_ids") or []
-            self._authed = {int(x) for x in ids}
+            return sorted(set(map(int, ids)))
         except Exception:
-            self._authed = set()
+            return []
+
+    def _load(self) -> Optional[List[int]]:
+        # Caller holds self._lock (or is __init__). Returns the ids found in the file
+        ids = self._read_ids()
+        if ids is None:
+            return None
+        if self._added or self._removed:
+            self._authed = array("q", sorted((set(ids) | self._added) - self._removed))
+        else:
+            self._authed = array("q", ids)
+        return ids
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        # Serialise read-merge-write against other processes sharing the store
+        if fcntl is None:
+            yield
+            return
+        with open(self._path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
 
-    def _save(self):
+    def _save(self, ids):
+        # Write a temp file and rename it over the store so a crash mid-write
+        # never leaves a truncated auth.json behind
+        tmp = self._path + ".tmp"
         try:
-            with open(self._path, "w", encoding="utf-8") as f:
-                json.dump({"user_ids": sorted(self._authed)}, f)
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps({"user_ids": ids}))
+            os.replace(tmp, self._path)
+            self._mtime_ns = os.stat(self._path).st_mtime_ns
         except Exception:
             pass
 
+    def _mark_dirty(self):
+        # Caller holds self._lock
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes to disk now"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not (self._added or self._removed):
+                return
+            # Merge into what is on disk now, not into our possibly stale copy
+            with self._file_lock():
+                ids = self._load() or []
+                self._added.clear()
+                self._removed.clear()
+                merged = self._authed.tolist()
+                if merged != ids:
+                    self._save(merged)
+
+    def _index(self, user_id: int) -> int:
+        # Position of user_id in self._authed, or -1
+        i = bisect_left(self._authed, user_id)
+        return i if i < len(self._authed) and self._authed[i] == user_id else -1
+
+    def _reload_if_changed(self) -> None:
+        # Another process sharing the store (bot or API worker) may have rewritten it;
+        # a single stat tells us whether the in-memory ids are stale
+        try:
+            mtime_ns = os.stat(self._path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        with self._lock:
+            # Pending local changes are replayed on top of the fresh file contents
+            self._load()
+
     def is_authenticated(self, user_id: int) -> bool:
-        return user_id in self._authed
+        self._reload_if_changed()
+        return self._index(user_id) >= 0
 
     def authenticate(self, user_id: int, username: str, password: str) -> bool:
         if username == self.cfg.username and password == self.cfg.password:
-            self._authed.add(user_id)
-            self._save()
+            with self._lock:
+                # Recorded even if already present: another process may remove it before we flush
+                self._added.add(user_id)
+                self._removed.discard(user_id)
+                if self._index(user_id) < 0:
+                    insort(self._authed, user_id)
+                self._mark_dirty()
             return True
         return False
 
     def logout(self, user_id: int) -> None:
-        if user_id in self._authed:
-            self._authed.remove(user_id)
-            self._save()
-
+        with self._lock:
+            self._removed.add(user_id)
+            self._added.discard(user_id)
+            i = self._index(user_id)
+            if i >= 0:
+                del self._authed[i]
+            self._mark_dirty()
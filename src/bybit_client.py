@@ -1,17 +1,115 @@
 from __future__ import annotations
 
 import hashlib
-import hmac
 import json
 import time
-import random
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, Optional
+from urllib.parse import urlencode
 
 import httpx
-
-
-@dataclass
+import numpy as np
+import orjson
+
+_SHA256_BLOCK_SIZE = 64
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; simulation falls back to plain NumPy
+    njit = None
+
+
+def _ohlcv_kernel(base_price: float, limit: int, seed: int):
+    """Generate simulated open/high/low/close/volume/turnover arrays."""
+    np.random.seed(seed)
+    opens = np.empty(limit)
+    highs = np.empty(limit)
+    lows = np.empty(limit)
+    closes = np.empty(limit)
+    volumes = np.empty(limit)
+    turnovers = np.empty(limit)
+    for i in range(limit):
+        o = base_price * (1.0 + np.random.uniform(-0.02, 0.02))  # ±2% per candle
+        c = o * (1.0 + np.random.uniform(-0.01, 0.01))
+        opens[i] = o
+        closes[i] = c
+        highs[i] = max(o, c) * (1.0 + np.random.uniform(0.0, 0.005))
+        lows[i] = min(o, c) * (1.0 - np.random.uniform(0.0, 0.005))
+        volumes[i] = np.random.uniform(10.0, 100.0)
+        turnovers[i] = volumes[i] * c
+    return opens, highs, lows, closes, volumes, turnovers
+
+
+# Compiled lazily on first use; cache=True persists the machine code under
+# NUMBA_CACHE_DIR so later processes skip the compile.
+_ohlcv_jit = njit(cache=True, fastmath=True)(_ohlcv_kernel) if njit is not None else None
+
+
+# One HTTP client per Bybit environment, shared by every BybitClient in the
+# process so TLS sessions and connections are reused across subsystems.
+_client_cache: Dict[str, httpx.AsyncClient] = {}
+_client_refs: Dict[str, int] = {}
+
+
+def _acquire_client(base_url: str) -> httpx.AsyncClient:
+    client = _client_cache.get(base_url)
+    if client is None or client.is_closed:
+        # HTTP/2 multiplexes concurrent calls over one connection and
+        # HPACK-compresses the repeated auth headers.
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=True,
+            timeout=httpx.Timeout(20.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60.0),
+        )
+        _client_cache[base_url] = client
+        _client_refs[base_url] = 0
+    _client_refs[base_url] += 1
+    return client
+
+
+async def _release_client(base_url: str) -> None:
+    """Drop one reference; the shared client is closed with its last user."""
+    refs = _client_refs.get(base_url, 0) - 1
+    if refs > 0:
+        _client_refs[base_url] = refs
+        return
+    _client_refs.pop(base_url, None)
+    client = _client_cache.pop(base_url, None)
+    if client is not None:
+        await client.aclose()
+
+
+@lru_cache(maxsize=256)
+def _order_body_prefix(
+    category: str,
+    symbol: str,
+    side: str,
+    orderType: str,
+    timeInForce: str,
+    reduceOnly: Optional[bool],
+    positionIdx: Optional[int],
+    leverage: Optional[str],
+) -> bytes:
+    """Serialized static part of a create-order body, open for the qty value."""
+    body: Dict[str, Any] = {
+        "category": category,
+        "symbol": symbol,
+        "side": side,
+        "orderType": orderType,
+        "timeInForce": timeInForce,
+    }
+    if reduceOnly is not None:
+        body["reduceOnly"] = reduceOnly
+    if positionIdx is not None:
+        body["positionIdx"] = positionIdx
+    if leverage is not None:
+        body["leverage"] = leverage
+    return orjson.dumps(body)[:-1] + b',"qty":'
+
+
+@dataclass(slots=True, frozen=True)
 class BybitConfig:
     api_key: str | None
     api_secret: str | None
@@ -28,177 +126,140 @@ class BybitClient:
     Auth/sign spec: https://bybit-exchange.github.io/docs/v5/intro
     Sign string: timestamp + apiKey + recvWindow + (queryString or requestBody)
     HMAC-SHA256(secret, sign_string).hexdigest()
+
+    Constructing it with ``cfg.simulation_mode`` set returns a
+    SimulationBybitClient, so the live request paths never check the mode.
     """
 
+    simulation_mode = False
+
+    def __new__(cls, cfg: BybitConfig):
+        if cls is BybitClient and cfg.simulation_mode:
+            cls = SimulationBybitClient
+        return super().__new__(cls)
+
     def __init__(self, cfg: BybitConfig):
         self.cfg = cfg
-        self.simulation_mode = cfg.simulation_mode
-        self.simulation_balance = cfg.simulation_balance or {}
         self.public_only = cfg.public_only
-        
-        if self.simulation_mode:
-            self.enabled = True  # Simulation is always enabled
-            self.base_url = "simulation://localhost"
-            self._client = None
-        else:
-            # In public_only mode, we don't require API keys but still create a client
-            self.enabled = self.public_only or bool(cfg.api_key and cfg.api_secret)
-            # Select correct environment
-            if cfg.testnet:
-                self.base_url = "https://api-testnet.bybit.com"
-            elif hasattr(cfg, 'demo') and cfg.demo:
-                self.base_url = "https://api-demo.bybit.com"
-            else:
-                self.base_url = "https://api.bybit.com"
-            
-            if self.enabled:
-                self._client = httpx.AsyncClient(base_url=self.base_url, timeout=20.0)
-            else:
-                self._client = None
-            
+        self._has_credentials = bool(cfg.api_key and cfg.api_secret)
+        self._setup_transport(cfg)
+
         self._recv_window = "5000"
+        # Sign inputs never change for the lifetime of the client
+        self._api_key_bytes = (cfg.api_key or "").encode()
+        self._recv_window_bytes = self._recv_window.encode()
+        # HMAC-SHA256 (RFC 2104) with the keyed inner/outer SHA-256 states
+        # precomputed; each sign copies them and hashes only the message
+        key = (cfg.api_secret or "").encode()
+        if len(key) > _SHA256_BLOCK_SIZE:
+            key = hashlib.sha256(key).digest()
+        key = key.ljust(_SHA256_BLOCK_SIZE, b"\0")
+        self._ipad_state = hashlib.sha256(bytes(b ^ 0x36 for b in key))
+        self._opad_state = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+        self._headers_template = {
+            "X-BAPI-API-KEY": cfg.api_key or "",
+            "X-BAPI-RECV-WINDOW": self._recv_window,
+            "X-BAPI-SIGN-TYPE": "2",  # HMAC SHA256
+            "Content-Type": "application/json",
+        }
+        self._bind_public_endpoints()
+
+    def _setup_transport(self, cfg: BybitConfig) -> None:
+        # In public_only mode, we don't require API keys but still create a client
+        self.enabled = self.public_only or self._has_credentials
+        # Select correct environment
+        if cfg.testnet:
+            self.base_url = "https://api-testnet.bybit.com"
+        elif hasattr(cfg, 'demo') and cfg.demo:
+            self.base_url = "https://api-demo.bybit.com"
+        else:
+            self.base_url = "https://api.bybit.com"
+
+        if self.enabled:
+            self._client = _acquire_client(self.base_url)
+        else:
+            self._client = None
+
+    def _bind_public_endpoints(self) -> None:
+        # Bind public endpoints once when there is no client, so calls skip
+        # the client-None branch entirely
+        if self._client is None:
+            self.get_tickers = self._public_disabled
+            self.get_kline = self._public_disabled
+            self.get_orderbook = self._public_disabled
+            self.get_recent_trades = self._public_disabled
+            self.get_instruments_info = self._public_disabled
+            self.get_funding_history = self._public_disabled
 
     def is_ready(self) -> bool:
-        return self.enabled or self.simulation_mode or self.public_only
+        return self.enabled or self.public_only
         
     def can_access_private_endpoints(self) -> bool:
         """Check if client has permissions for private endpoints"""
-        return (self.enabled and not self.public_only and bool(self.cfg.api_key and self.cfg.api_secret)) or self.simulation_mode
-
-    # --------------- Simulation Methods ---------------
-    def _simulate_market_data(self, symbol: str = "BTCUSDT") -> Dict[str, Any]:
-        """Generate realistic market data for simulation"""
-        current_price = 45000.0 if symbol == "BTCUSDT" else 3000.0
-        price_variation = random.uniform(-0.05, 0.05)  # ±5%
-        price = current_price * (1 + price_variation)
-        
-        return {
-            "retCode": 0,
-            "retMsg": "OK",
-            "result": {
-                "list": [{
-                    "symbol": symbol,
-                    "lastPrice": str(round(price, 2)),
-                    "prevPrice24h": str(round(price * 0.98, 2)),
-                    "price24hPcnt": str(round(price_variation * 100, 2)),
-                    "highPrice24h": str(round(price * 1.03, 2)),
-                    "lowPrice24h": str(round(price * 0.97, 2)),
-                    "volume24h": str(random.randint(1000, 10000)),
-                    "turnover24h": str(random.randint(10000000, 100000000)),
-                }]
-            }
-        }
-    
-    def _simulate_kline_data(self, symbol: str, interval: str, limit: int = 200) -> Dict[str, Any]:
-        """Generate realistic OHLCV data for simulation"""
-        base_price = 45000.0 if symbol == "BTCUSDT" else 3000.0
-        klines = []
-        
-        for i in range(limit):
-            timestamp = int(time.time() * 1000) - (limit - i) * 60000  # 1min intervals
-            price_change = random.uniform(-0.02, 0.02)  # ±2% per candle
-            
-            open_price = base_price * (1 + price_change)
-            close_price = open_price * (1 + random.uniform(-0.01, 0.01))
-            high_price = max(open_price, close_price) * (1 + random.uniform(0, 0.005))
-            low_price = min(open_price, close_price) * (1 - random.uniform(0, 0.005))
-            volume = random.uniform(10, 100)
-            
-            klines.append([
-                str(timestamp),
-                str(round(open_price, 2)),
-                str(round(high_price, 2)),
-                str(round(low_price, 2)),
-                str(round(close_price, 2)),
-                str(round(volume, 6)),
-                str(round(volume * close_price, 2))
-            ])
-        
-        return {
-            "retCode": 0,
-            "retMsg": "OK", 
-            "result": {
-                "symbol": symbol,
-                "category": "spot",
-                "list": klines
-            }
-        }
-    
-    def _simulate_wallet_balance(self) -> Dict[str, Any]:
-        """Generate realistic wallet balance for simulation"""
-        coins = []
-        for coin, balance in self.simulation_balance.items():
-            coins.append({
-                "coin": coin,
-                "walletBalance": str(balance),
-                "availableBalance": str(balance * 0.9),  # 90% available
-                "usdValue": str(balance * (45000 if coin == "BTC" else 3000 if coin == "ETH" else 1)),
-            })
-        
-        return {
-            "retCode": 0,
-            "retMsg": "OK",
-            "result": {
-                "list": [{
-                    "accountType": "UNIFIED",
-                    "coin": coins
-                }]
-            }
-        }
+        return self.enabled and not self.public_only and self._has_credentials
 
     # --------------- Helpers ---------------
     def _timestamp_ms(self) -> str:
-        return str(int(time.time() * 1000))
+        return str(time.time_ns() // 1_000_000)
 
-    def _sign(self, ts: str, payload: str) -> str:
-        secret = (self.cfg.api_secret or "").encode()
-        msg = (ts + (self.cfg.api_key or "") + self._recv_window + payload).encode()
-        return hmac.new(secret, msg, hashlib.sha256).hexdigest()
+    def _sign(self, ts: str, payload: bytes) -> str:
+        msg = b"".join((ts.encode(), self._api_key_bytes, self._recv_window_bytes, payload))
+        inner = self._ipad_state.copy()
+        inner.update(msg)
+        outer = self._opad_state.copy()
+        outer.update(inner.digest())
+        return outer.hexdigest()
+
+    @staticmethod
+    def _parse(r: httpx.Response) -> Dict[str, Any]:
+        # orjson reads the raw body bytes, skipping httpx's decode-to-str pass
+        return orjson.loads(r.content)
 
     def _auth_headers(self, sign: str, ts: str) -> Dict[str, str]:
+        headers = self._headers_template.copy()
+        headers["X-BAPI-SIGN"] = sign
+        headers["X-BAPI-TIMESTAMP"] = ts
+        return headers
+
+    # --------------- Public Endpoints ---------------
+    async def _public_disabled(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        # Client is not initialized (public_only with no key)
         return {
-            "X-BAPI-API-KEY": self.cfg.api_key or "",
-            "X-BAPI-SIGN": sign,
-            "X-BAPI-TIMESTAMP": ts,
-            "X-BAPI-RECV-WINDOW": self._recv_window,
-            "X-BAPI-SIGN-TYPE": "2",  # HMAC SHA256
-            "Content-Type": "application/json",
+            "retCode": 10002,
+            "retMsg": "Client not initialized. API access unavailable.",
+            "result": {}
         }
 
-    # --------------- Public Endpoints ---------------
     async def get_server_time(self) -> Dict[str, Any]:
-        # Handle simulation mode or client not initialized (public only with no client)
-        if self.simulation_mode or self._client is None:
-            current_time = int(time.time())
+        # Handle client not initialized (public only with no client)
+        if self._client is None:
+            now_ns = time.time_ns()
             return {
                 "retCode": 0,
-                "retMsg": "OK" if self.simulation_mode else "OK (local time)",
+                "retMsg": "OK (local time)",
                 "result": {
-                    "timeSecond": str(current_time),
-                    "timeNano": str(current_time * 1000000000)
+                    "timeSecond": str(now_ns // 1_000_000_000),
+                    "timeNano": str(now_ns)
                 }
             }
         
         try:
             r = await self._client.get("/v5/market/time")
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except Exception as e:
             # Fallback mechanism if API call fails
-            current_time = int(time.time())
+            now_ns = time.time_ns()
             return {
                 "retCode": 0,
                 "retMsg": f"OK (local fallback: {str(e)})",
                 "result": {
-                    "timeSecond": str(current_time),
-                    "timeNano": str(current_time * 1000000000)
+                    "timeSecond": str(now_ns // 1_000_000_000),
+                    "timeNano": str(now_ns)
                 }
             }
 
     async def get_tickers(self, category: str, symbol: Optional[str] = None) -> Dict[str, Any]:
-        if self.simulation_mode:
-            return self._simulate_market_data(symbol or "BTCUSDT")
-            
         # Validate category
         valid_categories = ["spot", "linear", "inverse", "option"]
         if category.lower() not in valid_categories:
@@ -208,26 +269,18 @@ class BybitClient:
                 "result": {}
             }
             
-        # Handle case where client is not initialized (public_only with no key)
-        if self._client is None:
-            return {
-                "retCode": 10002,
-                "retMsg": "Client not initialized. API access unavailable.",
-                "result": {}
-            }
-            
         try:
             params = {"category": category}
             if symbol:
                 params["symbol"] = symbol
             r = await self._client.get("/v5/market/tickers", params=params)
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 400:
                 # Try to extract error from Bybit response
                 try:
-                    error_data = e.response.json()
+                    error_data = self._parse(e.response)
                     return error_data
                 except:
                     pass
@@ -244,17 +297,6 @@ class BybitClient:
             }
 
     async def get_kline(self, category: str, symbol: str, interval: str, limit: int = 200, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, Any]:
-        if self.simulation_mode:
-            return self._simulate_kline_data(symbol, interval, limit)
-            
-        # Handle case where client is not initialized (public_only with no key)
-        if self._client is None:
-            return {
-                "retCode": 10002,
-                "retMsg": "Client not initialized. API access unavailable.",
-                "result": {}
-            }
-            
         try:
             params: Dict[str, Any] = {
                 "category": category,
@@ -268,7 +310,7 @@ class BybitClient:
                 params["end"] = end
             r = await self._client.get("/v5/market/kline", params=params)
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except Exception as e:
             return {
                 "retCode": 10000,
@@ -277,19 +319,11 @@ class BybitClient:
             }
 
     async def get_orderbook(self, category: str, symbol: str, limit: int = 50) -> Dict[str, Any]:
-        # Handle case where client is not initialized (public_only with no key)
-        if self._client is None:
-            return {
-                "retCode": 10002,
-                "retMsg": "Client not initialized. API access unavailable.",
-                "result": {}
-            }
-            
         try:
             params = {"category": category, "symbol": symbol, "limit": limit}
             r = await self._client.get("/v5/market/orderbook", params=params)
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except Exception as e:
             return {
                 "retCode": 10000,
@@ -298,19 +332,11 @@ class BybitClient:
             }
 
     async def get_recent_trades(self, category: str, symbol: str, limit: int = 50) -> Dict[str, Any]:
-        # Handle case where client is not initialized (public_only with no key)
-        if self._client is None:
-            return {
-                "retCode": 10002,
-                "retMsg": "Client not initialized. API access unavailable.",
-                "result": {}
-            }
-            
         try:
             params = {"category": category, "symbol": symbol, "limit": limit}
             r = await self._client.get("/v5/market/recent-trade", params=params)
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except Exception as e:
             return {
                 "retCode": 10000,
@@ -319,21 +345,13 @@ class BybitClient:
             }
 
     async def get_instruments_info(self, category: str, symbol: Optional[str] = None) -> Dict[str, Any]:
-        # Handle case where client is not initialized (public_only with no key)
-        if self._client is None:
-            return {
-                "retCode": 10002,
-                "retMsg": "Client not initialized. API access unavailable.",
-                "result": {}
-            }
-            
         try:
             params: Dict[str, Any] = {"category": category}
             if symbol:
                 params["symbol"] = symbol
             r = await self._client.get("/v5/market/instruments-info", params=params)
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except Exception as e:
             return {
                 "retCode": 10000,
@@ -342,19 +360,11 @@ class BybitClient:
             }
 
     async def get_funding_history(self, category: str, symbol: str, limit: int = 50) -> Dict[str, Any]:
-        # Handle case where client is not initialized (public_only with no key)
-        if self._client is None:
-            return {
-                "retCode": 10002,
-                "retMsg": "Client not initialized. API access unavailable.",
-                "result": {}
-            }
-            
         try:
             params = {"category": category, "symbol": symbol, "limit": limit}
             r = await self._client.get("/v5/market/funding-history", params=params)
             r.raise_for_status()
-            return r.json()
+            return self._parse(r)
         except Exception as e:
             return {
                 "retCode": 10000,
@@ -362,11 +372,37 @@ class BybitClient:
                 "result": {}
             }
 
+    # --------------- Pollers ---------------
+    def build_poller(self, endpoint: str, params: Optional[Dict[str, Any]] = None, *, signed: bool = False) -> httpx.Request:
+        """Pre-build a GET request for a fixed-argument polling loop.
+
+        URL and query are encoded once; pass the returned request to
+        send_poller on every tick. Signed pollers get fresh
+        X-BAPI-SIGN/X-BAPI-TIMESTAMP headers on each send.
+        """
+        if self._client is None:
+            raise RuntimeError("Client not initialized. API access unavailable.")
+        if not signed:
+            return self._client.build_request("GET", endpoint, params=params)
+        if not self.can_access_private_endpoints():
+            raise RuntimeError("Private endpoint requires API key/secret or simulation mode.")
+        query_str = urlencode(sorted((k, v) for k, v in (params or {}).items() if v is not None))
+        headers = self._auth_headers("", "")
+        return self._client.build_request("GET", f"{endpoint}?{query_str}", headers=headers)
+
+    async def send_poller(self, request: httpx.Request) -> Dict[str, Any]:
+        """Send a request built by build_poller and decode the response."""
+        if "X-BAPI-SIGN" in request.headers:
+            ts = self._timestamp_ms()
+            request.headers["X-BAPI-SIGN"] = self._sign(ts, request.url.query)
+            request.headers["X-BAPI-TIMESTAMP"] = ts
+        r = await self._client.send(request)
+        r.raise_for_status()
+        return self._parse(r)
+
     # --------------- Private Endpoints ---------------
     async def set_leverage(self, *, category: str, symbol: str, buyLeverage: str, sellLeverage: str) -> Dict[str, Any]:
         """Set leverage for a symbol. Bybit V5: POST /v5/position/set-leverage"""
-        if self.simulation_mode:
-            return {"retCode": 0, "retMsg": "OK", "result": {"symbol": symbol, "buyLeverage": buyLeverage, "sellLeverage": sellLeverage}}
         if not self.can_access_private_endpoints():
             raise RuntimeError("Private endpoint requires API key/secret or simulation mode.")
         path = "/v5/position/set-leverage"
@@ -377,19 +413,17 @@ class BybitClient:
             "buyLeverage": str(buyLeverage),
             "sellLeverage": str(sellLeverage),
         }
-        body_str = json.dumps(body, separators=(",", ":"))
-        sign = self._sign(ts, body_str)
+        body_bytes = orjson.dumps(body)
+        sign = self._sign(ts, body_bytes)
         headers = self._auth_headers(sign, ts)
-        r = await self._client.post(path, headers=headers, content=body_str)
+        r = await self._client.post(path, headers=headers, content=body_bytes)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
 
     async def switch_isolated(self, *, category: str, symbol: str, tradeMode: int, buyLeverage: Optional[str] = None, sellLeverage: Optional[str] = None) -> Dict[str, Any]:
         """Switch Cross/Isolated Margin. Bybit V5: POST /v5/position/switch-isolated
         tradeMode: 0=cross, 1=isolated
         """
-        if self.simulation_mode:
-            return {"retCode": 0, "retMsg": "OK", "result": {"symbol": symbol, "tradeMode": tradeMode}}
         if not self.can_access_private_endpoints():
             raise RuntimeError("Private endpoint requires API key/secret or simulation mode.")
         path = "/v5/position/switch-isolated"
@@ -403,16 +437,13 @@ class BybitClient:
             body["buyLeverage"] = str(buyLeverage)
         if sellLeverage is not None:
             body["sellLeverage"] = str(sellLeverage)
-        body_str = json.dumps(body, separators=(",", ":"))
-        sign = self._sign(ts, body_str)
+        body_bytes = orjson.dumps(body)
+        sign = self._sign(ts, body_bytes)
         headers = self._auth_headers(sign, ts)
-        r = await self._client.post(path, headers=headers, content=body_str)
+        r = await self._client.post(path, headers=headers, content=body_bytes)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
     async def get_wallet_balance(self, account_type: str = "UNIFIED", coin: Optional[str] = None) -> Dict[str, Any]:
-        if self.simulation_mode:
-            return self._simulate_wallet_balance()
-            
         if not self.can_access_private_endpoints():
             raise RuntimeError("Private endpoint requires API key/secret or simulation mode.")
 
@@ -424,15 +455,15 @@ class BybitClient:
         if coin:
             query["coin"] = coin
 
-        # Build query string in key=val& form sorted by key
-        query_items = sorted((k, v) for k, v in query.items() if v is not None)
-        query_str = "&".join(f"{k}={v}" for k, v in query_items)
+        # Build query string in key=val& form sorted by key; the exact same
+        # string is signed and sent so the two can never disagree
+        query_str = urlencode(sorted((k, v) for k, v in query.items() if v is not None))
 
-        sign = self._sign(ts, query_str)
+        sign = self._sign(ts, query_str.encode())
         headers = self._auth_headers(sign, ts)
-        r = await self._client.get(path, params=query, headers=headers)
+        r = await self._client.get(f"{path}?{query_str}", headers=headers)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
 
     # Example create order (minimal fields)
     async def create_order(
@@ -454,29 +485,18 @@ class BybitClient:
 
         path = "/v5/order/create"
         ts = self._timestamp_ms()
-        body: Dict[str, Any] = {
-            "category": category,
-            "symbol": symbol,
-            "side": side,
-            "orderType": orderType,
-            "qty": qty,
-            "timeInForce": timeInForce,
-        }
-        if price is not None:
-            body["price"] = price
-        if reduceOnly is not None:
-            body["reduceOnly"] = reduceOnly
-        if positionIdx is not None:
-            body["positionIdx"] = positionIdx
-        if leverage is not None:
-            body["leverage"] = leverage
-
-        body_str = json.dumps(body, separators=(",", ":"))
-        sign = self._sign(ts, body_str)
+        # Static fields come pre-serialized from a cache; only qty/price vary
+        prefix = _order_body_prefix(category, symbol, side, orderType, timeInForce, reduceOnly, positionIdx, leverage)
+        if price is None:
+            body_bytes = b"".join((prefix, orjson.dumps(qty), b"}"))
+        else:
+            body_bytes = b"".join((prefix, orjson.dumps(qty), b',"price":', orjson.dumps(price), b"}"))
+
+        sign = self._sign(ts, body_bytes)
         headers = self._auth_headers(sign, ts)
-        r = await self._client.post(path, headers=headers, content=body_str)
+        r = await self._client.post(path, headers=headers, content=body_bytes)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
 
     async def cancel_order(
         self,
@@ -495,12 +515,12 @@ class BybitClient:
             body["orderId"] = orderId
         if orderLinkId:
             body["orderLinkId"] = orderLinkId
-        body_str = json.dumps(body, separators=(",", ":"))
-        sign = self._sign(ts, body_str)
+        body_bytes = orjson.dumps(body)
+        sign = self._sign(ts, body_bytes)
         headers = self._auth_headers(sign, ts)
-        r = await self._client.post(path, headers=headers, content=body_str)
+        r = await self._client.post(path, headers=headers, content=body_bytes)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
 
     async def get_position_list(self, category: str, symbol: Optional[str] = None, settle_coin: Optional[str] = None) -> Dict[str, Any]:
         if not self.can_access_private_endpoints():
@@ -512,13 +532,12 @@ class BybitClient:
             query["symbol"] = symbol
         if settle_coin:
             query["settleCoin"] = settle_coin
-        query_items = sorted((k, v) for k, v in query.items() if v is not None)
-        query_str = "&".join(f"{k}={v}" for k, v in query_items)
-        sign = self._sign(ts, query_str)
+        query_str = urlencode(sorted((k, v) for k, v in query.items() if v is not None))
+        sign = self._sign(ts, query_str.encode())
         headers = self._auth_headers(sign, ts)
-        r = await self._client.get(path, params=query, headers=headers)
+        r = await self._client.get(f"{path}?{query_str}", headers=headers)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
 
     async def get_order_realtime(self, category: str, symbol: Optional[str] = None) -> Dict[str, Any]:
         if not self.can_access_private_endpoints():
@@ -528,13 +547,12 @@ class BybitClient:
         query: Dict[str, Any] = {"category": category}
         if symbol:
             query["symbol"] = symbol
-        query_items = sorted((k, v) for k, v in query.items() if v is not None)
-        query_str = "&".join(f"{k}={v}" for k, v in query_items)
-        sign = self._sign(ts, query_str)
+        query_str = urlencode(sorted((k, v) for k, v in query.items() if v is not None))
+        sign = self._sign(ts, query_str.encode())
         headers = self._auth_headers(sign, ts)
-        r = await self._client.get(path, params=query, headers=headers)
+        r = await self._client.get(f"{path}?{query_str}", headers=headers)
         r.raise_for_status()
-        return r.json()
+        return self._parse(r)
 
     # --------------- Formatting helpers ---------------
     @staticmethod
@@ -548,14 +566,12 @@ class BybitClient:
             total_equity = first.get("totalEquity")
             acct_type = first.get("accountType")
             coins = first.get("coin") or []
-            lines = [f"AccountType: {acct_type}", f"TotalEquity: {total_equity}"]
-            for c in coins[:10]:
-                lines.append(
-                    f"{c.get('coin')}: equity={c.get('equity')} avail={c.get('availableToWithdraw')} usdValue={c.get('usdValue')}"
-                )
-            if len(coins) > 10:
-                lines.append(f"… {len(coins) - 10} coin lainnya dipotong")
-            return "\n".join(lines)
+            coin_lines = [
+                f"{c.get('coin')}: equity={c.get('equity')} avail={c.get('availableToWithdraw')} usdValue={c.get('usdValue')}"
+                for c in coins[:10]
+            ]
+            trunc_lines = [f"… {len(coins) - 10} coin lainnya dipotong"] if len(coins) > 10 else []
+            return "\n".join([f"AccountType: {acct_type}", f"TotalEquity: {total_equity}", *coin_lines, *trunc_lines])
         except Exception:
             return json.dumps(resp)
 
@@ -566,13 +582,10 @@ class BybitClient:
             list_items = result.get("list") or []
             if not list_items:
                 return "Ticker tidak ditemukan."
-            rows = []
-            for it in list_items[:5]:
-                symbol = it.get("symbol")
-                lp = it.get("lastPrice") or it.get("lastPrice")
-                bid1 = it.get("bid1Price")
-                ask1 = it.get("ask1Price")
-                rows.append(f"{symbol}: last={lp} bid={bid1} ask={ask1}")
+            rows = [
+                f"{it.get('symbol')}: last={it.get('lastPrice')} bid={it.get('bid1Price')} ask={it.get('ask1Price')}"
+                for it in list_items[:5]
+            ]
             if len(list_items) > 5:
                 rows.append(f"… {len(list_items) - 5} simbol lainnya dipotong")
             return "\n".join(rows)
@@ -612,10 +625,153 @@ class BybitClient:
             return json.dumps(resp)
 
     async def close(self) -> None:
-        """Close underlying HTTP client if initialized."""
+        """Release the shared HTTP client; it closes once no BybitClient uses it."""
         client = getattr(self, "_client", None)
         if client is not None:
             try:
-                await client.aclose()
+                await _release_client(self.base_url)
             finally:
                 self._client = None
+                self._bind_public_endpoints()
+
+
+class SimulationBybitClient(BybitClient):
+    """BybitClient that serves generated market data and balances offline."""
+
+    simulation_mode = True
+
+    def _setup_transport(self, cfg: BybitConfig) -> None:
+        self.enabled = True  # Simulation is always enabled
+        self.base_url = "simulation://localhost"
+        self._client = None
+        self.simulation_balance = cfg.simulation_balance or {}
+        self._rng = np.random.default_rng()  # shared PCG64 generator for the simulators
+
+    def _bind_public_endpoints(self) -> None:
+        # Tickers and klines are simulated; the remaining public endpoints
+        # have no offline data
+        self.get_orderbook = self._public_disabled
+        self.get_recent_trades = self._public_disabled
+        self.get_instruments_info = self._public_disabled
+        self.get_funding_history = self._public_disabled
+
+    def is_ready(self) -> bool:
+        return True
+
+    def can_access_private_endpoints(self) -> bool:
+        return True
+
+    # --------------- Simulation Methods ---------------
+    def _simulate_market_data(self, symbol: str = "BTCUSDT") -> Dict[str, Any]:
+        """Generate realistic market data for simulation"""
+        current_price = 45000.0 if symbol == "BTCUSDT" else 3000.0
+        price_variation = float(self._rng.uniform(-0.05, 0.05))  # ±5%
+        price = current_price * (1 + price_variation)
+        
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {
+                "list": [{
+                    "symbol": symbol,
+                    "lastPrice": f"{price:.2f}",
+                    "prevPrice24h": f"{price * 0.98:.2f}",
+                    "price24hPcnt": f"{price_variation * 100:.2f}",
+                    "highPrice24h": f"{price * 1.03:.2f}",
+                    "lowPrice24h": f"{price * 0.97:.2f}",
+                    "volume24h": str(self._rng.integers(1000, 10001)),
+                    "turnover24h": str(self._rng.integers(10000000, 100000001)),
+                }]
+            }
+        }
+    
+    def _simulate_kline_data(self, symbol: str, interval: str, limit: int = 200) -> Dict[str, Any]:
+        """Generate realistic OHLCV data for simulation"""
+        base_price = 45000.0 if symbol == "BTCUSDT" else 3000.0
+        rng = self._rng
+
+        # Draw every candle at once; only the final string packing stays in Python
+        now_ms = time.time_ns() // 1_000_000
+        timestamps = now_ms - (limit - np.arange(limit)) * 60000  # 1min intervals
+        if _ohlcv_jit is not None:
+            seed = int(rng.integers(0, 2**31 - 1))
+            opens, highs, lows, closes, volumes, turnovers = _ohlcv_jit(base_price, limit, seed)
+        else:
+            opens = base_price * (1 + rng.uniform(-0.02, 0.02, limit))  # ±2% per candle
+            closes = opens * (1 + rng.uniform(-0.01, 0.01, limit))
+            highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.005, limit))
+            lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.005, limit))
+            volumes = rng.uniform(10, 100, limit)
+            turnovers = volumes * closes
+
+        klines = [
+            [str(ts), f"{o:.2f}", f"{h:.2f}", f"{l:.2f}", f"{c:.2f}", f"{v:.6f}", f"{t:.2f}"]
+            for ts, o, h, l, c, v, t in zip(
+                timestamps.tolist(),
+                opens.tolist(),
+                highs.tolist(),
+                lows.tolist(),
+                closes.tolist(),
+                volumes.tolist(),
+                turnovers.tolist(),
+            )
+        ]
+        
+        return {
+            "retCode": 0,
+            "retMsg": "OK", 
+            "result": {
+                "symbol": symbol,
+                "category": "spot",
+                "list": klines
+            }
+        }
+    
+    def _simulate_wallet_balance(self) -> Dict[str, Any]:
+        """Generate realistic wallet balance for simulation"""
+        coins = []
+        for coin, balance in self.simulation_balance.items():
+            coins.append({
+                "coin": coin,
+                "walletBalance": str(balance),
+                "availableBalance": str(balance * 0.9),  # 90% available
+                "usdValue": str(balance * (45000 if coin == "BTC" else 3000 if coin == "ETH" else 1)),
+            })
+        
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {
+                "list": [{
+                    "accountType": "UNIFIED",
+                    "coin": coins
+                }]
+            }
+        }
+
+    # --------------- Endpoints ---------------
+    async def get_server_time(self) -> Dict[str, Any]:
+        now_ns = time.time_ns()
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {
+                "timeSecond": str(now_ns // 1_000_000_000),
+                "timeNano": str(now_ns)
+            }
+        }
+
+    async def get_tickers(self, category: str, symbol: Optional[str] = None) -> Dict[str, Any]:
+        return self._simulate_market_data(symbol or "BTCUSDT")
+
+    async def get_kline(self, category: str, symbol: str, interval: str, limit: int = 200, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, Any]:
+        return self._simulate_kline_data(symbol, interval, limit)
+
+    async def set_leverage(self, *, category: str, symbol: str, buyLeverage: str, sellLeverage: str) -> Dict[str, Any]:
+        return {"retCode": 0, "retMsg": "OK", "result": {"symbol": symbol, "buyLeverage": buyLeverage, "sellLeverage": sellLeverage}}
+
+    async def switch_isolated(self, *, category: str, symbol: str, tradeMode: int, buyLeverage: Optional[str] = None, sellLeverage: Optional[str] = None) -> Dict[str, Any]:
+        return {"retCode": 0, "retMsg": "OK", "result": {"symbol": symbol, "tradeMode": tradeMode}}
+
+    async def get_wallet_balance(self, account_type: str = "UNIFIED", coin: Optional[str] = None) -> Dict[str, Any]:
+        return self._simulate_wallet_balance()
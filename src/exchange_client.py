@@ -20,6 +20,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds a bulk tickers snapshot is reused before refetching
+ALL_TICKERS_TTL = 1.0
+
 class ExchangeClient:
     """Client for accessing multiple cryptocurrency exchanges"""
     
@@ -41,6 +44,8 @@ class ExchangeClient:
             'kraken': 'https://api.kraken.com/0/public',
             'huobi': 'https://api.huobi.pro'
         }
+        # exchange -> (expires_at, symbol -> ticker) from get_all_tickers
+        self._all_tickers_cache: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
         
     async def close(self):
         """Close the HTTP client session"""
@@ -298,6 +303,124 @@ class ExchangeClient:
                 "error": f"Unexpected error for {exchange}: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
+
+    async def get_all_tickers(self, exchange: str = 'bybit') -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get every spot ticker of an exchange with a single bulk request
+        
+        Args:
+            exchange: The exchange to query
+            
+        Returns:
+            Mapping of exchange-formatted symbol to ticker data shaped like the
+            get_ticker response, or None when the exchange has no bulk endpoint
+            or the request failed
+        """
+        exchange = exchange.lower()
+        
+        cached = self._all_tickers_cache.get(exchange)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+            
+        base_url = self.exchange_base_urls.get(exchange)
+        tickers: Dict[str, Dict[str, Any]] = {}
+        now = datetime.now().isoformat()
+        
+        try:
+            if exchange == 'bybit':
+                response = await self.client.get(f"{base_url}/v5/market/tickers", params={"category": "spot"})
+                if response.status_code != 200:
+                    return None
+                for item in response.json().get("result", {}).get("list", []):
+                    tickers[item["symbol"]] = {
+                        "exchange": "Bybit",
+                        "symbol": item["symbol"],
+                        "data": {"result": {"list": [item]}},
+                        "timestamp": now
+                    }
+                    
+            elif exchange == 'binance':
+                # 24hr stats carry lastPrice too, so one call covers both get_ticker requests
+                response = await self.client.get(f"{base_url}/api/v3/ticker/24hr")
+                if response.status_code != 200:
+                    return None
+                for item in response.json():
+                    tickers[item["symbol"]] = {
+                        "exchange": "Binance",
+                        "symbol": item["symbol"],
+                        "data": {"symbol": item["symbol"], "price": item.get("lastPrice")},
+                        "data_24h": item,
+                        "timestamp": now
+                    }
+                    
+            elif exchange == 'kucoin':
+                response = await self.client.get(f"{base_url}/api/v1/market/allTickers")
+                if response.status_code != 200:
+                    return None
+                for item in response.json().get("data", {}).get("ticker", []):
+                    tickers[item["symbol"]] = {
+                        "exchange": "KuCoin",
+                        "symbol": item["symbol"],
+                        "data": {"data": item},
+                        "timestamp": now
+                    }
+                    
+            elif exchange == 'mexc':
+                response = await self.client.get(f"{base_url}/api/v3/ticker/price")
+                if response.status_code != 200:
+                    return None
+                for item in response.json():
+                    tickers[item["symbol"]] = {
+                        "exchange": "MEXC",
+                        "symbol": item["symbol"],
+                        "data": item,
+                        "timestamp": now
+                    }
+                    
+            elif exchange == 'okx':
+                response = await self.client.get(f"{base_url}/market/tickers", params={"instType": "SPOT"})
+                if response.status_code != 200:
+                    return None
+                for item in response.json().get("data", []):
+                    tickers[item["instId"]] = {
+                        "exchange": "OKX",
+                        "symbol": item["instId"],
+                        "data": {"data": [item]},
+                        "timestamp": now
+                    }
+                    
+            else:
+                # No bulk endpoint wired up; callers fall back to get_ticker
+                return None
+                
+        except Exception as e:
+            logger.warning(f"Bulk tickers request failed for {exchange}: {e}")
+            return None
+            
+        self._all_tickers_cache[exchange] = (time.monotonic() + ALL_TICKERS_TTL, tickers)
+        return tickers
+        
+    def ticker_from_all(self, all_tickers: Dict[str, Dict[str, Any]], symbol: str, exchange: str = 'bybit') -> Dict[str, Any]:
+        """
+        Look up one symbol in a get_all_tickers result
+        
+        Args:
+            all_tickers: Mapping returned by get_all_tickers for the exchange
+            symbol: The trading pair symbol (e.g., "BTC", "ETH", "BTCUSDT")
+            exchange: The exchange the mapping belongs to
+            
+        Returns:
+            Ticker data shaped like the get_ticker response
+        """
+        exchange = exchange.lower()
+        formatted_symbol = self.normalize_symbol(symbol, exchange)
+        ticker = all_tickers.get(formatted_symbol)
+        if ticker is None:
+            return {
+                "error": f"No ticker data for {formatted_symbol} on {exchange}",
+                "timestamp": datetime.now().isoformat()
+            }
+        return ticker
             
     async def get_server_time(self, exchange: str = 'bybit') -> Dict[str, Any]:
         """
@@ -1,86 +1,171 @@
 import pandas as pd
 import numpy as np
+import bottleneck as bn
 import talib
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; EMAs fall back to pandas ewm
+    njit = None
+
+MA_PERIODS = (7, 14, 21, 50, 100, 200)
+RSI_PERIODS = (7, 14, 21)
+MOMENTUM_PERIODS = (1, 3, 5, 10)
+VOLATILITY_PERIODS = (5, 10, 20)
+_EMA_SPANS = MA_PERIODS + (12, 26)
+
+# Column layout of the block produced by calculate_all_indicators
+FEATURE_COLS = [
+    'returns', 'log_returns',
+    *[name for p in MA_PERIODS
+      for name in (f'sma_{p}', f'ema_{p}', f'close_sma_{p}_ratio', f'sma_{p}_slope')],
+    *[f'rsi_{p}' for p in RSI_PERIODS],
+    'macd', 'macd_signal', 'macd_histogram',
+    'bb_middle', 'bb_upper', 'bb_lower', 'bb_width', 'bb_position',
+    'stoch_k', 'stoch_d', 'williams_r', 'atr', 'atr_ratio',
+    'volume_sma', 'volume_ratio',
+    *[f'momentum_{p}' for p in MOMENTUM_PERIODS],
+    *[f'volatility_{p}' for p in VOLATILITY_PERIODS],
+    'support', 'resistance', 'support_distance', 'resistance_distance',
+    'hl_ratio', 'oc_ratio',
+]
+_FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLS)}
+
+
+def _ema_multi_kernel(x, alphas):
+    """Adjusted EMAs (pandas ``ewm(span).mean()``) for every alpha in one pass."""
+    n = x.size
+    k = alphas.size
+    out = np.empty((k, n))
+    num = np.zeros(k)
+    den = np.zeros(k)
+    for i in range(n):
+        for j in range(k):
+            decay = 1.0 - alphas[j]
+            num[j] = x[i] + decay * num[j]
+            den[j] = 1.0 + decay * den[j]
+            out[j, i] = num[j] / den[j]
+    return out
+
+
+_ema_multi_jit = njit(cache=True, fastmath=True)(_ema_multi_kernel) if njit is not None else None
+
+
+def ema_multi(x, spans):
+    """Rows of EMAs of ``x`` for each span, matching ``Series.ewm(span=s).mean()``."""
+    spans = np.asarray(spans, dtype=np.float64)
+    if _ema_multi_jit is not None:
+        return _ema_multi_jit(x, 2.0 / (spans + 1.0))
+    s = pd.Series(x)
+    return np.vstack([s.ewm(span=span).mean().to_numpy() for span in spans])
+
 class TechnicalFeatures:
     def __init__(self):
         self.features = []
     
     def calculate_all_indicators(self, df):
         """Calculate comprehensive technical indicators"""
-        data = df.copy()
+        close = df['close']
+        # Contiguous float64 views handed straight to TA-Lib and bottleneck
+        o = df['open'].to_numpy(np.float64)
+        c = np.ascontiguousarray(close.to_numpy(np.float64, copy=False))
+        h = np.ascontiguousarray(df['high'].to_numpy(np.float64, copy=False))
+        l = np.ascontiguousarray(df['low'].to_numpy(np.float64, copy=False))
+        v = np.ascontiguousarray(df['volume'].to_numpy(np.float64, copy=False))
+        
+        # Every indicator is written into one preallocated float32 block
+        # (column-major, so each column is contiguous) joined onto df at the end
+        out = np.empty((len(df), len(FEATURE_COLS)), dtype=np.float32, order='F')
+        col = _FEATURE_INDEX
         
         # Basic price features
-        data['returns'] = data['close'].pct_change()
-        data['log_returns'] = np.log(data['close'] / data['close'].shift(1))
+        returns = close.pct_change().to_numpy()
+        out[:, col['returns']] = returns
+        out[:, col['log_returns']] = np.log(close / close.shift(1)).to_numpy()
+        
+        # All EMAs (six MA periods plus MACD fast/slow) in one fused pass
+        emas = dict(zip(_EMA_SPANS, ema_multi(c, _EMA_SPANS)))
         
         # Moving Averages
-        for period in [7, 14, 21, 50, 100, 200]:
-            data[f'sma_{period}'] = data['close'].rolling(period).mean()
-            data[f'ema_{period}'] = data['close'].ewm(span=period).mean()
+        for period in MA_PERIODS:
+            sma = bn.move_mean(c, period)
+            out[:, col[f'sma_{period}']] = sma
+            out[:, col[f'ema_{period}']] = emas[period]
             
             # MA ratios
-            data[f'close_sma_{period}_ratio'] = data['close'] / data[f'sma_{period}']
-            data[f'sma_{period}_slope'] = data[f'sma_{period}'].diff() / data[f'sma_{period}'].shift(1)
+            slope = np.full_like(sma, np.nan)
+            slope[1:] = np.diff(sma) / sma[:-1]
+            out[:, col[f'close_sma_{period}_ratio']] = c / sma
+            out[:, col[f'sma_{period}_slope']] = slope
         
         # RSI for multiple periods
-        for period in [7, 14, 21]:
-            data[f'rsi_{period}'] = talib.RSI(data['close'].values, timeperiod=period)
+        for period in RSI_PERIODS:
+            out[:, col[f'rsi_{period}']] = talib.RSI(c, timeperiod=period)
         
         # MACD
-        exp1 = data['close'].ewm(span=12).mean()
-        exp2 = data['close'].ewm(span=26).mean()
-        data['macd'] = exp1 - exp2
-        data['macd_signal'] = data['macd'].ewm(span=9).mean()
-        data['macd_histogram'] = data['macd'] - data['macd_signal']
-        
-        # Bollinger Bands
-        data['bb_middle'] = data['close'].rolling(20).mean()
-        bb_std = data['close'].rolling(20).std()
-        data['bb_upper'] = data['bb_middle'] + (bb_std * 2)
-        data['bb_lower'] = data['bb_middle'] - (bb_std * 2)
-        data['bb_width'] = data['bb_upper'] - data['bb_lower']
-        data['bb_position'] = (data['close'] - data['bb_lower']) / (data['bb_upper'] - data['bb_lower'])
-        
-        # Stochastic Oscillator
-        data['stoch_k'] = talib.STOCHK(data['high'].values, data['low'].values, 
-                                       data['close'].values, fastk_period=14)
-        data['stoch_d'] = talib.STOCHD(data['high'].values, data['low'].values, 
-                                       data['close'].values, fastk_period=14, 
-                                       slowk_period=3, slowd_period=3)
+        macd = emas[12] - emas[26]
+        macd_signal = ema_multi(macd, (9,))[0]
+        out[:, col['macd']] = macd
+        out[:, col['macd_signal']] = macd_signal
+        out[:, col['macd_histogram']] = macd - macd_signal
+        
+        # Bollinger Bands (running-window mean/std straight on the array)
+        bb_mid = bn.move_mean(c, 20)
+        bb_std = bn.move_std(c, 20, ddof=1)
+        bb_up = bb_mid + 2 * bb_std
+        bb_lo = bb_mid - 2 * bb_std
+        bb_width = bb_up - bb_lo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bb_pos = (c - bb_lo) / bb_width
+        out[:, col['bb_middle']] = bb_mid
+        out[:, col['bb_upper']] = bb_up
+        out[:, col['bb_lower']] = bb_lo
+        out[:, col['bb_width']] = bb_width
+        out[:, col['bb_position']] = bb_pos
+        
+        # Stochastic Oscillator (%K and %D from one TA-Lib pass)
+        out[:, col['stoch_k']], out[:, col['stoch_d']] = talib.STOCH(h, l, c, fastk_period=14,
+                                                                 slowk_period=3, slowd_period=3)
         
         # Williams %R
-        data['williams_r'] = talib.WILLR(data['high'].values, data['low'].values, 
-                                         data['close'].values, timeperiod=14)
+        out[:, col['williams_r']] = talib.WILLR(h, l, c, timeperiod=14)
         
         # Average True Range (ATR)
-        data['atr'] = talib.ATR(data['high'].values, data['low'].values, 
-                                data['close'].values, timeperiod=14)
-        data['atr_ratio'] = data['atr'] / data['close']
+        atr = talib.ATR(h, l, c, timeperiod=14)
+        out[:, col['atr']] = atr
+        out[:, col['atr_ratio']] = atr / c
         
         # Volume indicators
-        data['volume_sma'] = data['volume'].rolling(20).mean()
-        data['volume_ratio'] = data['volume'] / data['volume_sma']
+        volume_sma = bn.move_mean(v, 20)
+        out[:, col['volume_sma']] = volume_sma
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, col['volume_ratio']] = v / volume_sma
         
         # Price momentum
-        for period in [1, 3, 5, 10]:
-            data[f'momentum_{period}'] = data['close'] / data['close'].shift(period) - 1
+        for period in MOMENTUM_PERIODS:
+            momentum = np.full_like(c, np.nan)
+            momentum[period:] = c[period:] / c[:-period] - 1
+            out[:, col[f'momentum_{period}']] = momentum
         
         # Volatility measures
-        for period in [5, 10, 20]:
-            data[f'volatility_{period}'] = data['returns'].rolling(period).std()
+        for period in VOLATILITY_PERIODS:
+            out[:, col[f'volatility_{period}']] = bn.move_std(returns, period, ddof=1)
         
         # Support and Resistance levels
-        data['support'] = data['low'].rolling(20).min()
-        data['resistance'] = data['high'].rolling(20).max()
-        data['support_distance'] = (data['close'] - data['support']) / data['close']
-        data['resistance_distance'] = (data['resistance'] - data['close']) / data['close']
+        support = bn.move_min(l, 20)
+        resistance = bn.move_max(h, 20)
+        out[:, col['support']] = support
+        out[:, col['resistance']] = resistance
+        out[:, col['support_distance']] = (c - support) / c
+        out[:, col['resistance_distance']] = (resistance - c) / c
         
         # Market microstructure (if available)
-        data['hl_ratio'] = (data['high'] - data['low']) / data['close']
-        data['oc_ratio'] = (data['close'] - data['open']) / data['close']
+        out[:, col['hl_ratio']] = (h - l) / c
+        out[:, col['oc_ratio']] = (c - o) / c
         
-        return data
+        # Indicators are computed in float64 but stored as float32
+        features = pd.DataFrame(out, columns=FEATURE_COLS, index=df.index, copy=False)
+        return pd.concat([df, features], axis=1, copy=False)
     
     def create_target_variable(self, df, prediction_horizon=1, threshold=0.001):
         """
@@ -90,18 +175,11 @@ class TechnicalFeatures:
         - prediction_horizon: Hours ahead to predict
         - threshold: Minimum movement percentage to consider as signal
         """
-        data = df.copy()
-        
-        # Calculate future returns
-        data['future_return'] = data['close'].shift(-prediction_horizon) / data['close'] - 1
-        
-        # Create categorical target
-        conditions = [
-            data['future_return'] > threshold,   # Buy signal
-            data['future_return'] < -threshold,  # Sell signal
-        ]
-        choices = [1, -1]  # 1=Buy, -1=Sell, 0=Hold
+        # Calculate future returns (only close is needed; df itself is not copied)
+        future_return = df['close'].shift(-prediction_horizon) / df['close'] - 1
         
-        data['target'] = np.select(conditions, choices, default=0)
+        # Create categorical target: 1=Buy, -1=Sell, 0=Hold (branchless, int8)
+        fr = future_return.to_numpy()
+        target = np.subtract(fr > threshold, fr < -threshold, dtype=np.int8)
         
-        return data
\ No newline at end of file
+        return df.assign(future_return=future_return, target=target)
@@ -1,5 +1,5 @@
-from typing import Sequence, Optional
-from openai import OpenAI
+from typing import Iterator, Sequence, Optional
+from openai import AsyncOpenAI, OpenAI
 
 
 class LLMError(Exception):
@@ -21,6 +21,8 @@ class ZaiClient:
     ):
         self._enabled = bool(api_key)
         self._client = OpenAI(api_key=api_key, base_url=base_url) if api_key else None
+        # Native async client (pooled httpx.AsyncClient) for callers on an event loop
+        self._aclient = AsyncOpenAI(api_key=api_key, base_url=base_url) if api_key else None
         self._default_model = default_model
         self._temperature = float(temperature)
         self._max_tokens = int(max_tokens)
@@ -36,25 +38,85 @@ class ZaiClient:
         *,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        prompt_cache_key: Optional[str] = None,
     ) -> str:
         if not self._client:
             raise RuntimeError("ZaiClient disabled: missing ZAI_API_KEY")
+        # Lets the provider reuse its cached prefix for a repeated system prompt
+        extra_body = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None
         try:
             completion = self._client.chat.completions.create(
                 model=model or self._default_model,
                 messages=list(messages),
                 temperature=self._temperature if temperature is None else temperature,
                 max_tokens=self._max_tokens if max_tokens is None else max_tokens,
+                extra_body=extra_body,
             )
             return completion.choices[0].message.content or ""
         except Exception as e:
-            # Handle common provider insufficient balance error (e.g., 429/1113)
-            msg = str(e)
-            lowered = msg.lower()
-            if "insufficient balance" in lowered or "no resource package" in lowered or " 429" in msg or "1113" in msg:
-                raise LLMError(
-                    "Saldo/paket provider LLM tidak cukup. Silakan isi saldo atau aktifkan paket.",
-                    code="1113",
-                    status=429,
-                ) from e
+            self._raise_provider_error(e)
             raise
+
+    async def achat(
+        self,
+        messages: Sequence[dict],
+        model: Optional[str] = None,
+        *,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        prompt_cache_key: Optional[str] = None,
+    ) -> str:
+        """Async chat(): awaits the provider directly instead of blocking a thread."""
+        if not self._aclient:
+            raise RuntimeError("ZaiClient disabled: missing ZAI_API_KEY")
+        extra_body = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None
+        try:
+            completion = await self._aclient.chat.completions.create(
+                model=model or self._default_model,
+                messages=list(messages),
+                temperature=self._temperature if temperature is None else temperature,
+                max_tokens=self._max_tokens if max_tokens is None else max_tokens,
+                extra_body=extra_body,
+            )
+            return completion.choices[0].message.content or ""
+        except Exception as e:
+            self._raise_provider_error(e)
+            raise
+
+    def chat_stream(
+        self,
+        messages: Sequence[dict],
+        model: Optional[str] = None,
+        *,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Like chat(), but yields content deltas as the provider streams them."""
+        if not self._client:
+            raise RuntimeError("ZaiClient disabled: missing ZAI_API_KEY")
+        try:
+            stream = self._client.chat.completions.create(
+                model=model or self._default_model,
+                messages=list(messages),
+                temperature=self._temperature if temperature is None else temperature,
+                max_tokens=self._max_tokens if max_tokens is None else max_tokens,
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self._raise_provider_error(e)
+            raise
+
+    @staticmethod
+    def _raise_provider_error(e: Exception) -> None:
+        # Handle common provider insufficient balance error (e.g., 429/1113)
+        msg = str(e)
+        lowered = msg.lower()
+        if "insufficient balance" in lowered or "no resource package" in lowered or " 429" in msg or "1113" in msg:
+            raise LLMError(
+                "Saldo/paket provider LLM tidak cukup. Silakan isi saldo atau aktifkan paket.",
+                code="1113",
+                status=429,
+            ) from e
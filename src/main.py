@@ -9,9 +9,15 @@ import asyncio
 import contextlib
 import json
 import logging
+import re
+import sys
 import threading
-from typing import Dict, Any, List
-from datetime import datetime
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+import orjson
 
 # MCP imports
 from mcp.server import Server
@@ -29,14 +35,134 @@ from llm import ZaiClient
 from bybit_client import BybitClient, BybitConfig
 from exchange_client import ExchangeClient
 from natural_trading_assistant import TradingToolsRegistry
-from mcp_telegram_client import MCPClient, TelegramMCPIntegration
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SHUTDOWN_TIMEOUT = 5.0  # seconds allowed per client close() on shutdown
+SERVER_INFO_TTL = 300.0  # seconds the /exchanges reply is reused
+TELEGRAM_MESSAGE_LIMIT = 4000  # chars per reply (Telegram caps at 4096)
+STREAM_EDIT_INTERVAL = 0.5  # min seconds between streamed preview edits
+STREAMED_RESPONSE_TYPES = {"top_comparison", "arbitrage", "overview"}
+
+# Cheap intent check for speculative price prefetching
+_SPECULATIVE_SYMBOL_RE = re.compile(r"\b(BTC|ETH|BNB|SOL|XRP)\b", re.IGNORECASE)
+_SPECULATIVE_INTENT_RE = re.compile(r"\b(compare|top)\b", re.IGNORECASE)
+
+# JSON object inside a ```json (or bare ```) fenced block
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Startup modes: argv[1] -> (log banner, run Telegram bot, run MCP server)
+MODES = {
+    "mcp-only": ("🔧 MCP Server Only mode", False, True),
+    "telegram-only": ("🤖 Telegram Bot Only mode", True, False),
+}
+
+# Static Telegram command replies, built once at import
+_START_MSG = """
+🚀 **Unified Trading Bot**
+
+👋 Bot trading dengan **Telegram Chat + MCP Server**!
+
+🌟 **Fitur:**
+• 🤖 Telegram chat dengan LLM
+• 🔧 MCP server untuk tool integration
+• 📊 Multi-exchange real-time data
+• 🧠 Natural language understanding
+
+💬 **Contoh:**
+• "Harga Bitcoin sekarang?"
+• "Show me top 5 CEX prices for BTC"
+• "Compare ETH across exchanges"
+
+✨ **Mode Dual:** Chat + MCP Server aktif!
+        """
+
+_HELP_MSG = """
+🆘 **Panduan Unified Bot**
+
+🗣️ **Natural Language:**
+• Chat normal dalam bahasa Indonesia/English
+• Bot memahami konteks trading cryptocurrency
+• Tanya apapun tentang harga, exchanges, arbitrage
+
+📊 **Commands:**
+• `/start` - Mulai bot
+• `/help` - Panduan ini
+• `/status` - Status sistem
+• `/price [SYMBOL] [EXCHANGE]` - Get price (e.g. /price BTCUSDT binance)
+• `/compare [SYMBOL]` - Compare prices across exchanges
+• `/balance` - Get wallet balance (requires API key)
+• `/exchanges` - List available exchanges
+
+🔧 **MCP Server:**
+• Jalan bersamaan dengan Telegram
+• Tools untuk integration dengan Claude/AI systems
+• Natural language tool calls
+
+💡 **Tips:**
+• Gunakan bahasa natural
+• Bot connect ke multiple exchanges
+• Real-time market data tersedia
+
+🚀 **Dual Mode:** Telegram + MCP Server!
+        """
+
+_EXCHANGES_HEADER = (
+    "🏢 **Available Exchanges:**\n\n"
+    "**🟡 Bybit** (Primary)\n"
+    "• Spot, Linear, Inverse, Options\n"
+    "• Public & Private endpoints\n\n"
+)
+_EXCHANGES_MULTI = (
+    "**🌐 Multi-Exchange Support:**\n"
+    + "".join(f"• {ex}\n" for ex in ("Binance", "KuCoin", "OKX", "Huobi", "MEXC"))
+    + "\n"
+)
+_EXCHANGES_FOOTER = (
+    "**💡 Usage:**\n"
+    "• `/price BTCUSDT binance` - Single exchange\n"
+    "• `/compare ETHUSDT` - Compare across exchanges\n"
+    "• Chat: 'Compare BTC prices' - Natural language\n"
+)
+
+class _StreamingReply:
+    """Live Telegram preview of a streamed LLM reply, edited at most every STREAM_EDIT_INTERVAL"""
+
+    def __init__(self, message):
+        self._message = message
+        self._last_edit = 0.0
+        self.sent = None  # preview message, once something has been shown
+
+    async def update(self, text: str) -> None:
+        now = time.monotonic()
+        if not text.strip() or now - self._last_edit < STREAM_EDIT_INTERVAL:
+            return
+        self._last_edit = now
+        # Plain text while streaming: partial Markdown would be rejected
+        preview = text[:TELEGRAM_MESSAGE_LIMIT - 1] + "…"
+        with contextlib.suppress(Exception):
+            if self.sent is None:
+                self.sent = await self._message.reply_text(preview)
+            else:
+                await self.sent.edit_text(preview)
+
+def _dumps_pretty(data: Any) -> str:
+    """Indented JSON for prompts and fallback replies"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
 class UnifiedTradingBot:
     """Unified bot dengan Telegram chat + MCP server capabilities"""
 
+    # LLM action -> (registry tool, parameter defaults, response type)
+    _ACTION_SPEC = {
+        "compare_top_exchanges": ("compare_top_exchanges", {"symbol": "BTC", "count": 5}, "top_comparison"),
+        "get_multiple_prices": ("get_multiple_prices", {"symbol": "BTC", "exchanges": ["binance", "bybit"]}, "comparison"),
+        "analyze_arbitrage": ("analyze_arbitrage", {"symbol": "BTC", "exchanges": ["binance", "bybit", "kucoin", "mexc", "okx"]}, "arbitrage"),
+        "get_price": ("get_price", {"symbol": "BTC", "exchange": "binance"}, "single_price"),
+        "get_market_overview": ("get_market_overview", {"symbols": ["BTC"], "exchanges": ["binance", "bybit", "kucoin"]}, "overview"),
+    }
+
     def __init__(self):
         self.config = get_config()
 
@@ -49,6 +175,9 @@ class UnifiedTradingBot:
             max_tokens=3000,
         )
 
+        # Caps concurrent blocking LLM calls (threads and provider rate limit)
+        self._llm_sem = asyncio.Semaphore(self.config.llm_concurrency)
+
         self.exchange_client = ExchangeClient()
         self.bybit_client = BybitClient(BybitConfig(
             api_key=self.config.bybit_api_key,
@@ -58,13 +187,41 @@ class UnifiedTradingBot:
         ))
         self.tools_registry = TradingToolsRegistry(self.exchange_client, self.bybit_client)
 
+        # Last 10 conversations, oldest evicted automatically
+        self.conversation_context = deque(maxlen=10)
+
+        self._understanding_prompt = self._build_understanding_prompt()
+
+        # Subsystems are created on demand by start()
+        self.mcp_client = None
+        self.mcp_integration = None
+        self.mcp_server = None
+        self.telegram_app = None
+        self._closeable_clients = []
+
+        # /exchanges reply rendered from MCP server info, cached for SERVER_INFO_TTL
+        self._exchanges_reply = None
+        self._exchanges_reply_expiry = 0.0
+
+        # Strong refs to fire-and-forget tasks (e.g. typing indicators)
+        self._background_tasks = set()
+
+        logger.info("🚀 Unified Trading Bot initialized")
+
+    def _init_telegram(self) -> None:
+        """Create the Telegram app and the MCP client its commands use"""
+        # Imported here so mcp-only mode never loads the HTTP client layer
+        from mcp_telegram_client import MCPClient, TelegramMCPIntegration
+
         # MCP Client untuk mengakses MCP server eksternal
         self.mcp_client = MCPClient("http://localhost:8001")
         self.mcp_integration = TelegramMCPIntegration(self.mcp_client)
-        
-        # MCP Server
-        self.mcp_server = Server("unified-trading-bot")
-        self.conversation_context = []
+
+        # Clients that need closing on shutdown, resolved once up front
+        self._closeable_clients = [
+            client for client in (self.exchange_client, self.bybit_client, self.mcp_client)
+            if hasattr(client, "close")
+        ]
 
         # Telegram Bot
         if self.config.telegram_bot_token:
@@ -76,8 +233,79 @@ class UnifiedTradingBot:
             self.telegram_app = None
             logger.warning("No Telegram token - Telegram bot disabled")
 
+    def _init_mcp_server(self) -> None:
+        """Create the MCP server and register its handlers"""
+        self.mcp_server = Server("unified-trading-bot")
         self._register_mcp_handlers()
-        logger.info("🚀 Unified Trading Bot initialized - Telegram + MCP ready!")
+
+    async def start(self, telegram: bool = True, mcp: bool = True) -> None:
+        """Initialize only the requested subsystems and run them until done"""
+        if telegram:
+            self._init_telegram()
+        if mcp:
+            self._init_mcp_server()
+
+        async with asyncio.TaskGroup() as tg:
+            if mcp:
+                tg.create_task(self.run_mcp_server())
+            if telegram:
+                tg.create_task(self.run_telegram_bot())
+
+    async def run_mcp_server(self) -> None:
+        """Run MCP server"""
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.mcp_server.run(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name="unified-trading-bot",
+                        server_version="5.0.0",
+                        capabilities=ServerCapabilities(
+                            tools={"listChanged": True}
+                        )
+                    ),
+                )
+        except Exception as e:
+            logger.error(f"MCP Server error: {e}")
+
+    async def run_telegram_bot(self) -> None:
+        """Run Telegram bot"""
+        if self.telegram_app:
+            try:
+                logger.info("🤖 Starting Telegram bot...")
+                await self.telegram_app.initialize()
+                await self.telegram_app.start()
+                if self.config.webhook_url:
+                    # Telegram pushes updates to us; nothing polls getUpdates
+                    url_path = self.config.webhook_secret
+                    await self.telegram_app.updater.start_webhook(
+                        listen="0.0.0.0",
+                        port=self.config.webhook_port,
+                        url_path=url_path,
+                        webhook_url=f"{self.config.webhook_url.rstrip('/')}/{url_path}",
+                    )
+                else:
+                    await self.telegram_app.updater.start_polling()
+
+                # Keep running (suspended until cancelled, no periodic wakeups)
+                await asyncio.Event().wait()
+
+            except asyncio.CancelledError:
+                logger.info("Telegram bot task cancelled - shutting down")
+                raise
+
+            except Exception as e:
+                logger.error(f"Telegram bot error: {e}")
+            finally:
+                with contextlib.suppress(Exception):
+                    await self.telegram_app.updater.stop()
+                with contextlib.suppress(Exception):
+                    await self.telegram_app.stop()
+                with contextlib.suppress(Exception):
+                    await self.telegram_app.shutdown()
+        else:
+            logger.warning("Telegram bot disabled - no token")
 
     def _setup_telegram_handlers(self):
         """Setup Telegram bot handlers"""
@@ -90,60 +318,26 @@ class UnifiedTradingBot:
         self.telegram_app.add_handler(CommandHandler("exchanges", self.telegram_exchanges))
         self.telegram_app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.telegram_message))
 
-    async def telegram_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Telegram /start command"""
-        welcome_msg = """
-🚀 **Unified Trading Bot**
-
-👋 Bot trading dengan **Telegram Chat + MCP Server**!
-
-🌟 **Fitur:**
-• 🤖 Telegram chat dengan LLM
-• 🔧 MCP server untuk tool integration
-• 📊 Multi-exchange real-time data
-• 🧠 Natural language understanding
+    def _send_typing(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Show the typing indicator in the background instead of awaiting its round-trip"""
+        task = asyncio.create_task(
+            context.bot.send_chat_action(chat_id=update.effective_chat.id, action=ChatAction.TYPING)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
 
-💬 **Contoh:**
-• "Harga Bitcoin sekarang?"
-• "Show me top 5 CEX prices for BTC"
-• "Compare ETH across exchanges"
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Background task failed: {task.exception()}")
 
-✨ **Mode Dual:** Chat + MCP Server aktif!
-        """
-        await update.message.reply_text(welcome_msg, parse_mode='Markdown')
+    async def telegram_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Telegram /start command"""
+        await update.message.reply_text(_START_MSG, parse_mode='Markdown')
 
     async def telegram_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Telegram /help command"""
-        help_msg = """
-🆘 **Panduan Unified Bot**
-
-🗣️ **Natural Language:**
-• Chat normal dalam bahasa Indonesia/English
-• Bot memahami konteks trading cryptocurrency
-• Tanya apapun tentang harga, exchanges, arbitrage
-
-📊 **Commands:**
-• `/start` - Mulai bot
-• `/help` - Panduan ini
-• `/status` - Status sistem
-• `/price [SYMBOL] [EXCHANGE]` - Get price (e.g. /price BTCUSDT binance)
-• `/compare [SYMBOL]` - Compare prices across exchanges
-• `/balance` - Get wallet balance (requires API key)
-• `/exchanges` - List available exchanges
-
-🔧 **MCP Server:**
-• Jalan bersamaan dengan Telegram
-• Tools untuk integration dengan Claude/AI systems
-• Natural language tool calls
-
-💡 **Tips:**
-• Gunakan bahasa natural
-• Bot connect ke multiple exchanges
-• Real-time market data tersedia
-
-🚀 **Dual Mode:** Telegram + MCP Server!
-        """
-        await update.message.reply_text(help_msg, parse_mode='Markdown')
+        await update.message.reply_text(_HELP_MSG, parse_mode='Markdown')
 
     async def telegram_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Telegram /status command"""
@@ -182,7 +376,7 @@ class UnifiedTradingBot:
                 if len(args) > 1:
                     exchange = args[1].lower()
             
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action=ChatAction.TYPING)
+            self._send_typing(update, context)
             
             # Use MCP integration for price query
             query = f"{symbol} price {exchange}"
@@ -202,7 +396,7 @@ class UnifiedTradingBot:
             if args:
                 symbol = args[0].upper()
             
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action=ChatAction.TYPING)
+            self._send_typing(update, context)
             
             # Use MCP integration for comparison
             query = f"compare {symbol} prices"
@@ -215,7 +409,7 @@ class UnifiedTradingBot:
     async def telegram_balance(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Telegram /balance command - get wallet balance"""
         try:
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action=ChatAction.TYPING)
+            self._send_typing(update, context)
             
             # Use MCP integration for balance
             response = await self.mcp_integration.handle_balance_query()
@@ -227,36 +421,25 @@ class UnifiedTradingBot:
     async def telegram_exchanges(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Telegram /exchanges command - list available exchanges"""
         try:
-            # Get server info from MCP
-            server_info = await self.mcp_client.get_server_info()
-            
-            if server_info.get("success", True):
+            # Server info changes rarely; the rendered reply is reused until the TTL expires
+            now = time.monotonic()
+            if self._exchanges_reply is None or now >= self._exchanges_reply_expiry:
+                # Get server info from MCP
+                server_info = await self.mcp_client.get_server_info()
+
+                if not server_info.get("success", True):
+                    await update.message.reply_text("❌ Cannot get exchange info")
+                    return
+
                 endpoints = server_info.get("endpoints", {})
-                
-                response = "🏢 **Available Exchanges:**\n\n"
-                
-                # Bybit
-                response += "**🟡 Bybit** (Primary)\n"
-                response += "• Spot, Linear, Inverse, Options\n"
-                response += "• Public & Private endpoints\n\n"
-                
-                # Multi-exchange
+
+                # Only the multi-exchange section depends on server info
                 multi_exchange = endpoints.get("multi_exchange", {})
-                if multi_exchange:
-                    response += "**🌐 Multi-Exchange Support:**\n"
-                    exchanges = ["Binance", "KuCoin", "OKX", "Huobi", "MEXC"]
-                    for ex in exchanges:
-                        response += f"• {ex}\n"
-                    response += "\n"
-                
-                response += "**💡 Usage:**\n"
-                response += "• `/price BTCUSDT binance` - Single exchange\n"
-                response += "• `/compare ETHUSDT` - Compare across exchanges\n"
-                response += "• Chat: 'Compare BTC prices' - Natural language\n"
-                
-                await update.message.reply_text(response, parse_mode='Markdown')
-            else:
-                await update.message.reply_text("❌ Cannot get exchange info")
+                middle = _EXCHANGES_MULTI if multi_exchange else ""
+                self._exchanges_reply = _EXCHANGES_HEADER + middle + _EXCHANGES_FOOTER
+                self._exchanges_reply_expiry = now + SERVER_INFO_TTL
+
+            await update.message.reply_text(self._exchanges_reply, parse_mode='Markdown')
                 
         except Exception as e:
             await update.message.reply_text(f"❌ Error: {str(e)}")
@@ -266,12 +449,13 @@ class UnifiedTradingBot:
         user_id = update.effective_user.id
         message_text = update.message.text
 
-        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action=ChatAction.TYPING)
+        self._send_typing(update, context)
         logger.info(f"Telegram User {user_id}: {message_text}")
 
         try:
-            # Process dengan shared LLM processing
-            response = await self._process_with_llm_understanding(message_text)
+            # Process dengan shared LLM processing (long LLM replies stream into one message)
+            stream = _StreamingReply(update.message)
+            response = await self._process_with_llm_understanding(message_text, stream)
 
             if response and len(response) > 0:
                 response_text = response[0].text if hasattr(response[0], 'text') else str(response[0])
@@ -283,13 +467,13 @@ class UnifiedTradingBot:
                         " atau analisis strategi. Cukup tanya aja, ya!"
                     )
 
-                # Split long messages
-                if len(response_text) > 4000:
-                    chunks = [response_text[i:i+4000] for i in range(0, len(response_text), 4000)]
-                    for chunk in chunks:
-                        await update.message.reply_text(chunk, parse_mode='Markdown')
-                else:
-                    await update.message.reply_text(response_text, parse_mode='Markdown')
+                # Split long messages on Markdown-friendly boundaries
+                chunks = self._split_markdown(response_text)
+                if stream.sent is not None:
+                    # Replace the streamed preview with the final first chunk
+                    await stream.sent.edit_text(next(chunks), parse_mode='Markdown')
+                for chunk in chunks:
+                    await update.message.reply_text(chunk, parse_mode='Markdown')
             else:
                 await update.message.reply_text("❌ Tidak ada response dari sistem")
 
@@ -297,27 +481,51 @@ class UnifiedTradingBot:
             logger.error(f"Telegram error: {e}", exc_info=True)
             await update.message.reply_text(f"❌ Error: {str(e)}", parse_mode='Markdown')
 
+    @staticmethod
+    def _split_markdown(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> Iterator[str]:
+        """Yield chunks of at most limit chars, cut at a blank line, newline or space"""
+        i, n = 0, len(text)
+        while n - i > limit:
+            end = i + limit
+            cut = text.rfind("\n\n", i, end)
+            if cut <= i:
+                cut = text.rfind("\n", i, end)
+            if cut <= i:
+                cut = text.rfind(" ", i, end)
+            if cut <= i:
+                cut = end
+            yield text[i:cut]
+            # Drop the separator whitespace so the next chunk doesn't start blank
+            i = cut
+            while i < n and text[i] in " \n":
+                i += 1
+        if i < n:
+            yield text[i:]
+
     def _register_mcp_handlers(self):
         """Register MCP server handlers"""
 
+        # Built once; MCP only serializes the list, never mutates it
+        self._tools_list = [
+            Tool(
+                name="natural_trading_query",
+                description="Process ANY natural language query about cryptocurrency trading, prices, exchanges, arbitrage, or market analysis. The system uses advanced LLM understanding to comprehend complex requests like 'show me BTC prices on top 5 CEX', 'compare ETH between exchanges', 'arbitrage opportunities', or 'harga Bitcoin terbaik'. Supports English and Indonesian naturally.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Natural language query about cryptocurrency trading. Examples: 'show me top 5 CEX prices for BTC', 'compare Ethereum prices between Binance and KuCoin', 'what are arbitrage opportunities for Bitcoin?', 'harga Bitcoin di exchange terbaik'"
+                        }
+                    },
+                    "required": ["query"]
+                }
+            )
+        ]
+
         @self.mcp_server.list_tools()
         async def list_tools() -> List[Tool]:
-            return [
-                Tool(
-                    name="natural_trading_query",
-                    description="Process ANY natural language query about cryptocurrency trading, prices, exchanges, arbitrage, or market analysis. The system uses advanced LLM understanding to comprehend complex requests like 'show me BTC prices on top 5 CEX', 'compare ETH between exchanges', 'arbitrage opportunities', or 'harga Bitcoin terbaik'. Supports English and Indonesian naturally.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Natural language query about cryptocurrency trading. Examples: 'show me top 5 CEX prices for BTC', 'compare Ethereum prices between Binance and KuCoin', 'what are arbitrage opportunities for Bitcoin?', 'harga Bitcoin di exchange terbaik'"
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                )
-            ]
+            return self._tools_list
 
         @self.mcp_server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
@@ -336,39 +544,37 @@ class UnifiedTradingBot:
         """Cleanup resources when Telegram application stops."""
         logger.info("🛑 Telegram application shutting down - releasing clients")
 
-        cleanup_tasks = []
-        if hasattr(self.exchange_client, "close"):
-            cleanup_tasks.append(self.exchange_client.close())
-        if hasattr(self.bybit_client, "close"):
-            cleanup_tasks.append(self.bybit_client.close())
-        if hasattr(self.mcp_client, "close"):
-            cleanup_tasks.append(self.mcp_client.close())
+        # Close all clients concurrently; a hung close() is bounded by the timeout
+        cleanup_tasks = [
+            asyncio.wait_for(client.close(), timeout=SHUTDOWN_TIMEOUT)
+            for client in self._closeable_clients
+        ]
 
         if cleanup_tasks:
             results = await asyncio.gather(*cleanup_tasks, return_exceptions=True)
-            for exc in results:
-                if isinstance(exc, Exception):
+            for client, exc in zip(self._closeable_clients, results):
+                if isinstance(exc, asyncio.TimeoutError):
+                    logger.warning(f"Cleanup timed out after {SHUTDOWN_TIMEOUT}s: {type(client).__name__}")
+                elif isinstance(exc, Exception):
                     logger.warning(f"Cleanup error: {exc}")
 
-    async def _process_with_llm_understanding(self, user_query: str) -> List[TextContent]:
+    async def _process_with_llm_understanding(
+        self, user_query: str, stream: Optional[_StreamingReply] = None
+    ) -> List[TextContent]:
         """Process query with TRUE LLM understanding - no hardcoded rules"""
 
         # Add to conversation context
-        self.conversation_context.append({
-            "timestamp": datetime.now().isoformat(),
-            "user_query": user_query
-        })
+        self.conversation_context.append({"user_query": user_query})
 
-        # Keep last 10 conversations for context
-        if len(self.conversation_context) > 10:
-            self.conversation_context = self.conversation_context[-10:]
+        # Obvious comparison queries start fetching prices while the LLM thinks
+        prefetched = self._start_speculative_fetch(user_query)
 
         try:
             # Step 1: LLM analyzes dan understand user intent secara natural
             understanding = await self._get_llm_understanding(user_query)
 
             # Step 2: Execute berdasarkan LLM understanding
-            result = await self._execute_based_on_understanding(understanding, user_query)
+            result = await self._execute_based_on_understanding(understanding, user_query, prefetched, stream)
 
             return [TextContent(type="text", text=result)]
 
@@ -376,17 +582,51 @@ class UnifiedTradingBot:
             logger.error(f"Error in LLM processing: {e}", exc_info=True)
             return [TextContent(type="text", text=f"❌ Error processing query: {str(e)}")]
 
-    async def _get_llm_understanding(self, user_query: str) -> Dict[str, Any]:
-        """Get TRUE LLM understanding of user query - no hardcoded patterns"""
+        finally:
+            if prefetched is not None and not prefetched[2].done():
+                prefetched[2].cancel()
 
-        # Build context dari conversation sebelumnya
-        context_summary = ""
-        if self.conversation_context:
-            recent_queries = [ctx["user_query"] for ctx in self.conversation_context[-3:]]
-            context_summary = f"Recent conversation: {' | '.join(recent_queries)}"
+    def _start_speculative_fetch(self, user_query: str) -> Optional[Tuple[str, Dict[str, Any], asyncio.Task]]:
+        """Prefetch compare_top_exchanges for queries that clearly ask for it"""
+        symbol_match = _SPECULATIVE_SYMBOL_RE.search(user_query)
+        if not symbol_match or not _SPECULATIVE_INTENT_RE.search(user_query):
+            return None
+
+        params = {"symbol": symbol_match.group(1).upper(), "count": 5}
+        task = asyncio.create_task(self.tools_registry.execute_tool("compare_top_exchanges", params))
+        return "compare_top_exchanges", params, task
 
-        # System prompt yang natural dan comprehensive
-        system_prompt = f"""You are an expert cryptocurrency trading analyst with deep market knowledge. Analyze the user's natural language query and understand their EXACT intent.
+    async def _llm_chat(self, messages: List[Dict[str, Any]], **kwargs) -> str:
+        """Await the async LLM chat, bounded by the LLM semaphore"""
+        async with self._llm_sem:
+            return await self.llm_client.achat(messages, **kwargs)
+
+    async def _llm_stream(self, messages: List[Dict[str, Any]], **kwargs) -> AsyncIterator[str]:
+        """Yield chat_stream deltas from a worker thread, bounded by the LLM semaphore"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def produce():
+            try:
+                for piece in self.llm_client.chat_stream(messages, **kwargs):
+                    loop.call_soon_threadsafe(queue.put_nowait, piece)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        async with self._llm_sem:
+            producer = asyncio.ensure_future(asyncio.to_thread(produce))
+            while (item := await queue.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            await producer
+
+    def _build_understanding_prompt(self) -> str:
+        """Static part of the understanding system prompt, built once"""
+        return f"""You are an expert cryptocurrency trading analyst with deep market knowledge. Analyze the user's natural language query and understand their EXACT intent.
 
 AVAILABLE EXCHANGES: {', '.join(self.config.available_exchanges)}
 
@@ -410,8 +650,6 @@ CRITICAL: Understand natural language context:
 - "arbitrage for Bitcoin" = analyze_arbitrage(BTC, all_exchanges)
 - "harga Bitcoin terbaik" = compare_top_exchanges(BTC, 5)
 
-{context_summary}
-
 Respond ONLY with valid JSON:
 {{
     "understanding": "Clear explanation of what user wants",
@@ -420,14 +658,28 @@ Respond ONLY with valid JSON:
     "reasoning": "Why this tool and parameters"
 }}"""
 
+    async def _get_llm_understanding(self, user_query: str) -> Dict[str, Any]:
+        """Get TRUE LLM understanding of user query - no hardcoded patterns"""
+
+        # Build context dari conversation sebelumnya
+        context_summary = ""
+        if self.conversation_context:
+            start = max(0, len(self.conversation_context) - 3)
+            recent_queries = [ctx["user_query"] for ctx in islice(self.conversation_context, start, None)]
+            context_summary = f"Recent conversation: {' | '.join(recent_queries)}"
+
+        # Static prompt prefix first, dynamic context last (keeps the prefix cacheable)
+        system_prompt = self._understanding_prompt
+        if context_summary:
+            system_prompt += f"\n\n{context_summary}"
+
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_query}
         ]
 
         try:
-            llm_response = await asyncio.to_thread(
-                self.llm_client.chat,
+            llm_response = await self._llm_chat(
                 messages,
                 temperature=0.1,
                 max_tokens=1000
@@ -457,17 +709,14 @@ Respond ONLY with valid JSON:
             # Clean response
             response = response.strip()
 
-            # Extract JSON block
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                if end != -1:
-                    response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                if end != -1:
-                    response = response[start:end].strip()
+            # Fast path: bare JSON object, no fence to look for
+            if response.startswith("{"):
+                return json.loads(response)
+
+            # Extract JSON from a ```json / ``` fenced block in one pass
+            match = _JSON_BLOCK_RE.search(response)
+            if match:
+                return json.loads(match.group(1))
 
             # Parse JSON
             return json.loads(response)
@@ -482,7 +731,13 @@ Respond ONLY with valid JSON:
                 "reasoning": "JSON parse failed"
             }
 
-    async def _execute_based_on_understanding(self, understanding: Dict[str, Any], original_query: str) -> str:
+    async def _execute_based_on_understanding(
+        self,
+        understanding: Dict[str, Any],
+        original_query: str,
+        prefetched: Optional[Tuple[str, Dict[str, Any], asyncio.Task]] = None,
+        stream: Optional[_StreamingReply] = None,
+    ) -> str:
         """Execute action berdasarkan LLM understanding"""
 
         action = understanding.get("action")
@@ -498,65 +753,21 @@ Respond ONLY with valid JSON:
 
         try:
             # Execute tool berdasarkan LLM understanding
-            if action == "compare_top_exchanges":
-                symbol = parameters.get("symbol", "BTC")
-                count = parameters.get("count", 5)
-
-                result = await self.tools_registry.execute_tool("compare_top_exchanges", {
-                    "symbol": symbol,
-                    "count": count
-                })
-
-                if result.get("success"):
-                    return await self._format_with_llm(result, user_understanding, original_query, "top_comparison")
-
-            elif action == "get_multiple_prices":
-                symbol = parameters.get("symbol", "BTC")
-                exchanges = parameters.get("exchanges", ["binance", "bybit"])
-
-                result = await self.tools_registry.execute_tool("get_multiple_prices", {
-                    "symbol": symbol,
-                    "exchanges": exchanges
-                })
-
-                if result.get("success"):
-                    return await self._format_with_llm(result, user_understanding, original_query, "comparison")
-
-            elif action == "analyze_arbitrage":
-                symbol = parameters.get("symbol", "BTC")
-                exchanges = parameters.get("exchanges", ["binance", "bybit", "kucoin", "mexc", "okx"])
-
-                result = await self.tools_registry.execute_tool("analyze_arbitrage", {
-                    "symbol": symbol,
-                    "exchanges": exchanges
-                })
-
-                if result.get("success"):
-                    return await self._format_with_llm(result, user_understanding, original_query, "arbitrage")
-
-            elif action == "get_price":
-                symbol = parameters.get("symbol", "BTC")
-                exchange = parameters.get("exchange", "binance")
-
-                result = await self.tools_registry.execute_tool("get_price", {
-                    "symbol": symbol,
-                    "exchange": exchange
-                })
-
-                if result.get("success"):
-                    return await self._format_with_llm(result, user_understanding, original_query, "single_price")
-
-            elif action == "get_market_overview":
-                symbols = parameters.get("symbols", ["BTC"])
-                exchanges = parameters.get("exchanges", ["binance", "bybit", "kucoin"])
-
-                result = await self.tools_registry.execute_tool("get_market_overview", {
-                    "symbols": symbols,
-                    "exchanges": exchanges
-                })
+            spec = self._ACTION_SPEC.get(action) if isinstance(action, str) else None
+            if spec:
+                tool_name, defaults, response_type = spec
+                tool_params = {key: parameters.get(key, default) for key, default in defaults.items()}
+
+                # Reuse the speculative fetch only when the LLM picked exactly that call
+                if prefetched is not None and prefetched[:2] == (tool_name, tool_params):
+                    result = await prefetched[2]
+                else:
+                    if prefetched is not None:
+                        prefetched[2].cancel()
+                    result = await self.tools_registry.execute_tool(tool_name, tool_params)
 
                 if result.get("success"):
-                    return await self._format_with_llm(result, user_understanding, original_query, "overview")
+                    return await self._format_with_llm(result, user_understanding, original_query, response_type, stream)
 
             logger.warning(f"Unknown action '{action}' – falling back to conversational reply")
             return await self._handle_non_tool_response(user_understanding, original_query)
@@ -576,8 +787,7 @@ Respond ONLY with valid JSON:
         )
 
         try:
-            response = await asyncio.to_thread(
-                self.llm_client.chat,
+            response = await self._llm_chat(
                 [
                     {"role": "system", "content": system_prompt},
                     {
@@ -599,8 +809,54 @@ Respond ONLY with valid JSON:
                 "atau analisis strategi. Cukup tanya aja, ya!"
             )
 
-    async def _format_with_llm(self, tool_result: Dict[str, Any], user_understanding: str, original_query: str, response_type: str) -> str:
-        """Format response using LLM untuk natural presentation"""
+    async def _format_with_llm(
+        self,
+        tool_result: Dict[str, Any],
+        user_understanding: str,
+        original_query: str,
+        response_type: str,
+        stream: Optional[_StreamingReply] = None,
+    ) -> str:
+        """Format response: templated data plus a short LLM insight line"""
+
+        if self.config.rich_formatting:
+            return await self._format_rich(tool_result, user_understanding, original_query, response_type, stream)
+
+        rendered = self._format_structured(tool_result, response_type)
+
+        insight_prompt = (
+            f"Given this table:\n{rendered}\n\n"
+            "Write ONE sentence of market insight (<=30 words). Answer in the user's language."
+        )
+        try:
+            insight = (await self._llm_chat(
+                [
+                    {"role": "system", "content": insight_prompt},
+                    {"role": "user", "content": original_query},
+                ],
+                temperature=0.2,
+                max_tokens=80
+            )).strip()
+        except Exception as e:
+            logger.error(f"Error getting LLM insight: {e}")
+            insight = ""
+
+        formatted_response = f"{rendered}\n\n💡 {insight}" if insight else rendered
+
+        # Add context to conversation
+        self.conversation_context[-1]["response"] = formatted_response
+
+        return formatted_response
+
+    async def _format_rich(
+        self,
+        tool_result: Dict[str, Any],
+        user_understanding: str,
+        original_query: str,
+        response_type: str,
+        stream: Optional[_StreamingReply] = None,
+    ) -> str:
+        """Format the whole response with the LLM (config.rich_formatting)"""
 
         # System prompt untuk formatting
         format_prompt = f"""You are a professional cryptocurrency market analyst. Format the trading data into a natural, informative response.
@@ -618,17 +874,21 @@ FORMATTING GUIDELINES:
 - Include timestamp
 
 DATA TO FORMAT:
-{json.dumps(tool_result, indent=2)}
+{_dumps_pretty(tool_result)}
 
 Create a well-formatted, natural response that directly answers the user's query."""
 
+        messages = [{"role": "system", "content": format_prompt}]
         try:
-            formatted_response = await asyncio.to_thread(
-                self.llm_client.chat,
-                [{"role": "system", "content": format_prompt}],
-                temperature=0.2,
-                max_tokens=1500
-            )
+            if stream is not None and response_type in STREAMED_RESPONSE_TYPES:
+                # Large payloads: show tokens as they arrive instead of after completion
+                parts = []
+                async for piece in self._llm_stream(messages, temperature=0.2, max_tokens=1500):
+                    parts.append(piece)
+                    await stream.update("".join(parts))
+                formatted_response = "".join(parts)
+            else:
+                formatted_response = await self._llm_chat(messages, temperature=0.2, max_tokens=1500)
 
             # Add context to conversation
             self.conversation_context[-1]["response"] = formatted_response
@@ -638,10 +898,24 @@ Create a well-formatted, natural response that directly answers the user's query
         except Exception as e:
             logger.error(f"Error formatting with LLM: {e}")
             # Fallback formatting
-            return self._fallback_format(tool_result, response_type)
+            return self._format_structured(tool_result, response_type)
+
+    @staticmethod
+    def _price_lines(items: List[Dict[str, Any]]) -> str:
+        """One line per exchange ticker (or its error)"""
+        lines = []
+        for item in items:
+            exchange = str(item.get("exchange", "N/A")).upper()
+            if "error" in item:
+                lines.append(f"❌ **{exchange}**: {item['error']}")
+            else:
+                lines.append(f"💰 **{exchange}**: `${item.get('price', 'N/A')}` ({item.get('change_24h', 'N/A')} 24h)")
+        return "\n".join(lines) + "\n"
 
-    def _fallback_format(self, result: Dict[str, Any], response_type: str) -> str:
-        """Fallback formatting jika LLM formatting gagal"""
+    def _format_structured(self, result: Dict[str, Any], response_type: str) -> str:
+        """Deterministic Markdown rendering of a tool result"""
+
+        response = None
 
         if response_type == "top_comparison":
             comparison = result.get("comparison", [])
@@ -652,7 +926,9 @@ Create a well-formatted, natural response that directly answers the user's query
                     exchange = item.get("exchange", "N/A").upper()
                     price = item.get("price", "N/A")
                     response += f"{emoji} **{exchange}**: `${price}`\n"
-                return response
+                spread = result.get("price_spread") or {}
+                if len(comparison) > 1:
+                    response += f"\n📊 Spread: `{spread.get('amount', 0):.2f}` ({spread.get('percentage', 0):.3f}%)\n"
 
         elif response_type == "arbitrage":
             opportunities = result.get("opportunities", [])
@@ -661,92 +937,76 @@ Create a well-formatted, natural response that directly answers the user's query
                 for i, opp in enumerate(opportunities[:3]):
                     response += f"🚀 **#{i+1}**: Buy {opp.get('buy_exchange', 'N/A')} → Sell {opp.get('sell_exchange', 'N/A')}\n"
                     response += f"   Profit: {opp.get('profit_percent', 0):.2f}%\n\n"
-                return response
-
-        return f"📊 **Data Retrieved**: {json.dumps(result, indent=2)}"
-
-async def main():
-    """Main function - run both Telegram bot and MCP server"""
-
-    # Initialize unified bot
-    bot = UnifiedTradingBot()
-
-    logger.info("🚀 Starting Unified Trading Bot...")
-    logger.info("🤖 Telegram Bot + 🔧 MCP Server")
-
-    # Function to run MCP server
-    async def run_mcp_server():
-        """Run MCP server"""
-        try:
-            async with stdio_server() as (read_stream, write_stream):
-                await bot.mcp_server.run(
-                    read_stream,
-                    write_stream,
-                    InitializationOptions(
-                        server_name="unified-trading-bot",
-                        server_version="5.0.0",
-                        capabilities=ServerCapabilities(
-                            tools={"listChanged": True}
-                        )
-                    ),
+            elif "opportunities" in result:
+                response = f"💎 **Arbitrage**: no opportunities above 0.1% for {result.get('symbol', 'N/A')}\n"
+
+        elif response_type == "single_price":
+            data = result.get("data") or {}
+            if "error" in data:
+                response = f"❌ {data['error']}\n"
+            elif data:
+                response = (
+                    f"💰 **{data.get('symbol', 'N/A')}** on **{str(data.get('exchange', 'N/A')).upper()}**: `${data.get('price', 'N/A')}`\n"
+                    f"📈 24h: {data.get('change_24h', 'N/A')} | High: {data.get('high_24h', 'N/A')} | Low: {data.get('low_24h', 'N/A')}\n"
+                    f"📊 Volume 24h: {data.get('volume_24h', 'N/A')}\n"
                 )
-        except Exception as e:
-            logger.error(f"MCP Server error: {e}")
 
-    # Function to run Telegram bot
-    async def run_telegram_bot():
-        """Run Telegram bot"""
-        if bot.telegram_app:
-            try:
-                logger.info("🤖 Starting Telegram bot...")
-                await bot.telegram_app.initialize()
-                await bot.telegram_app.start()
-                await bot.telegram_app.updater.start_polling()
+        elif response_type == "comparison":
+            data = result.get("data", [])
+            if data:
+                response = f"📊 **{result.get('symbol', '')} Price Comparison**\n\n" + self._price_lines(data)
 
-                # Keep running
-                while True:
-                    await asyncio.sleep(1)
+        elif response_type == "overview":
+            overview = result.get("overview", {})
+            if overview:
+                response = "🌐 **Market Overview**\n"
+                for symbol, symbol_data in overview.items():
+                    response += f"\n**{symbol}**\n" + self._price_lines(symbol_data.get("data", []))
 
-            except asyncio.CancelledError:
-                logger.info("Telegram bot task cancelled - shutting down")
-                raise
+        if response is None:
+            return f"📊 **Data Retrieved**: {_dumps_pretty(result)}"
 
-            except Exception as e:
-                logger.error(f"Telegram bot error: {e}")
-            finally:
-                with contextlib.suppress(Exception):
-                    await bot.telegram_app.updater.stop()
-                with contextlib.suppress(Exception):
-                    await bot.telegram_app.stop()
-                with contextlib.suppress(Exception):
-                    await bot.telegram_app.shutdown()
-        else:
-            logger.warning("Telegram bot disabled - no token")
+        if result.get("timestamp"):
+            response += f"\n🕒 `{result['timestamp']}`"
+        return response
 
-    # Choose startup mode based on environment
-    import sys
+async def main():
+    """Main function - run the Telegram bot and/or MCP server"""
 
-    if len(sys.argv) > 1 and sys.argv[1] == "mcp-only":
-        # MCP server only mode
-        logger.info("🔧 MCP Server Only mode")
-        await run_mcp_server()
+    # Initialize unified bot (shared components only)
+    bot = UnifiedTradingBot()
 
-    elif len(sys.argv) > 1 and sys.argv[1] == "telegram-only":
-        # Telegram bot only mode
-        logger.info("🤖 Telegram Bot Only mode")
-        await run_telegram_bot()
+    logger.info("🚀 Starting Unified Trading Bot...")
 
+    # Explicit mode from argv; otherwise a TTY means a human (Telegram bot)
+    # and piped stdio means an MCP client connection
+    mode = sys.argv[1] if len(sys.argv) > 1 else ""
+    if mode not in MODES:
+        mode = "telegram-only" if sys.stdin.isatty() else "mcp-only"
+    banner, telegram, mcp = MODES[mode]
+    logger.info(banner)
+
+    async with contextlib.AsyncExitStack() as stack:
+        if telegram:
+            # The MCP HTTP pool is shared process-wide; close it when the bot stops
+            from mcp_telegram_client import get_shared_client
+            await stack.enter_async_context(get_shared_client())
+        await bot.start(telegram=telegram, mcp=mcp)
+
+def run() -> None:
+    """Run main() on uvloop when it is installed, else the default asyncio loop"""
+    try:
+        import uvloop
+    except ImportError:  # uvloop is optional (not available on Windows)
+        asyncio.run(main())
+        return
+
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
     else:
-        # Dual mode - both running
-        logger.info("🚀 Dual Mode - Telegram + MCP Server")
-
-        # Check if we're in stdio mode (MCP client connection)
-        if sys.stdin.isatty():
-            # Interactive mode - run Telegram bot
-            await run_telegram_bot()
-        else:
-            # stdio mode - run MCP server
-            await run_mcp_server()
+        uvloop.install()
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
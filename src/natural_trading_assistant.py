@@ -5,20 +5,47 @@ Menggunakan proper MCP tools integration dengan LLM yang benar-benar memahami co
 """
 
 import asyncio
-import json
 import logging
+import time
 from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime
 
+import numpy as np
+import orjson
+
 from llm import ZaiClient, LLMError
 from exchange_client import ExchangeClient
 from bybit_client import BybitClient, BybitConfig
 from config import get_config
 
+try:
+    import fastjsonschema
+except ImportError:  # fastjsonschema is optional; tools fall back to _validate_parameters
+    fastjsonschema = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tool responses reuse one ISO timestamp string for this long
+TIMESTAMP_RESOLUTION_NS = 100_000_000  # 100 ms
+_TS_CACHE = {"ts": "", "ns": 0}
+
+def _now_iso() -> str:
+    """datetime.now().isoformat(), diformat ulang paling sering sekali per 100 ms"""
+    now_ns = time.time_ns()
+    if now_ns - _TS_CACHE["ns"] >= TIMESTAMP_RESOLUTION_NS:
+        _TS_CACHE["ts"] = datetime.now().isoformat()
+        _TS_CACHE["ns"] = now_ns
+    return _TS_CACHE["ts"]
+
+def _dumps(obj: Any) -> str:
+    """json.dumps(obj, indent=2) lewat orjson"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+# From this many symbols on, market overview reads one bulk tickers snapshot per exchange
+BULK_OVERVIEW_MIN_SYMBOLS = 3
+
 class TradingToolsRegistry:
     """Registry untuk semua trading tools yang tersedia"""
     
@@ -26,6 +53,10 @@ class TradingToolsRegistry:
         self.exchange_client = exchange_client
         self.bybit_client = bybit_client
         self.tools = {}
+        # Exchange list is fixed per client, so common top-N selections are built once
+        self._top_cache = {
+            n: tuple(exchange_client.get_supported_exchanges()[:n]) for n in (3, 5, 10, 20)
+        }
         self._register_tools()
     
     def _register_tools(self):
@@ -95,6 +126,13 @@ class TradingToolsRegistry:
             },
             "function": self._analyze_arbitrage
         }
+        
+        # Parameter schemas are static too: compile each into a validator function once
+        for tool_info in self.tools.values():
+            tool_info["validator"] = self._compile_validator(tool_info["parameters"])
+        
+        # Tools never change after registration, so the LLM description is built once
+        self._tools_desc_cache = self._build_tools_description()
     
     async def _get_price(self, symbol: str, exchange: str) -> Dict[str, Any]:
         """Get price dari single exchange"""
@@ -104,17 +142,22 @@ class TradingToolsRegistry:
             return {
                 "success": True,
                 "data": formatted,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    async def _get_multiple_prices(self, symbol: str, exchanges: List[str]) -> Dict[str, Any]:
-        """Get price dari multiple exchanges"""
+    async def _get_multiple_prices(self, symbol: str, exchanges: List[str],
+                                   all_tickers: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Get price dari multiple exchanges, pakai snapshot all_tickers per exchange kalau ada"""
         try:
+            all_tickers = all_tickers or {}
             tasks = []
             for exchange in exchanges:
-                tasks.append(self.exchange_client.get_ticker(symbol, exchange))
+                if exchange in all_tickers:
+                    tasks.append(self._ticker_from_all(all_tickers[exchange], symbol, exchange))
+                else:
+                    tasks.append(self.exchange_client.get_ticker(symbol, exchange))
             
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
@@ -133,16 +176,20 @@ class TradingToolsRegistry:
                 "success": True,
                 "symbol": symbol,
                 "data": formatted_results,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    async def _ticker_from_all(self, tickers: Dict[str, Any], symbol: str, exchange: str) -> Dict[str, Any]:
+        # Awaitable wrapper so local lookups share the gather with network calls
+        return self.exchange_client.ticker_from_all(tickers, symbol, exchange)
+    
     async def _compare_top_exchanges(self, symbol: str, count: int = 5) -> Dict[str, Any]:
         """Compare price across top exchanges"""
         try:
             # Get top exchanges
-            top_exchanges = self.exchange_client.get_supported_exchanges()[:count]
+            top_exchanges = self._top_cache.get(count) or tuple(self.exchange_client.get_supported_exchanges()[:count])
             
             # Get prices from all exchanges
             result = await self._get_multiple_prices(symbol, top_exchanges)
@@ -150,21 +197,7 @@ class TradingToolsRegistry:
             if not result["success"]:
                 return result
             
-            # Sort by price untuk find best prices
-            valid_prices = []
-            for item in result["data"]:
-                if "error" not in item and "price" in item:
-                    try:
-                        price_float = float(str(item["price"]).replace(",", ""))
-                        valid_prices.append({
-                            **item,
-                            "price_float": price_float
-                        })
-                    except:
-                        continue
-            
-            # Sort by price
-            valid_prices.sort(key=lambda x: x["price_float"])
+            valid_prices = self._parse_sorted_prices(result["data"])
             
             return {
                 "success": True,
@@ -172,28 +205,72 @@ class TradingToolsRegistry:
                 "comparison": valid_prices,
                 "lowest_price": valid_prices[0] if valid_prices else None,
                 "highest_price": valid_prices[-1] if valid_prices else None,
-                "price_spread": {
-                    "amount": valid_prices[-1]["price_float"] - valid_prices[0]["price_float"] if len(valid_prices) > 1 else 0,
-                    "percentage": ((valid_prices[-1]["price_float"] - valid_prices[0]["price_float"]) / valid_prices[0]["price_float"] * 100) if len(valid_prices) > 1 else 0
-                },
-                "timestamp": datetime.now().isoformat()
+                "price_spread": self._price_spread(valid_prices),
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def _parse_sorted_prices(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Valid price entries dari _get_multiple_prices, ditambah price_float dan diurutkan naik"""
+        valid_prices = []
+        for item in items:
+            if "error" not in item and "price" in item:
+                try:
+                    price_float = float(str(item["price"]).replace(",", ""))
+                    valid_prices.append({
+                        **item,
+                        "price_float": price_float
+                    })
+                except:
+                    continue
+        
+        # Sort by price
+        valid_prices.sort(key=lambda x: x["price_float"])
+        return valid_prices
+    
+    @staticmethod
+    def _price_spread(valid_prices: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Spread antara harga terendah dan tertinggi dari list yang sudah diurutkan"""
+        if len(valid_prices) < 2:
+            return {"amount": 0, "percentage": 0}
+        low, high = valid_prices[0]["price_float"], valid_prices[-1]["price_float"]
+        return {"amount": high - low, "percentage": (high - low) / low * 100}
+    
     async def _get_market_overview(self, symbols: List[str], exchanges: List[str]) -> Dict[str, Any]:
         """Get comprehensive market overview"""
         try:
-            overview = {}
+            # Many symbols: one bulk snapshot per exchange instead of len(symbols) calls each
+            all_tickers = {}
+            if len(symbols) >= BULK_OVERVIEW_MIN_SYMBOLS:
+                snapshots = await asyncio.gather(
+                    *(self.exchange_client.get_all_tickers(exchange) for exchange in exchanges),
+                    return_exceptions=True
+                )
+                all_tickers = {
+                    exchange: snapshot
+                    for exchange, snapshot in zip(exchanges, snapshots)
+                    if isinstance(snapshot, dict)
+                }
             
-            for symbol in symbols:
-                symbol_data = await self._get_multiple_prices(symbol, exchanges)
-                overview[symbol] = symbol_data
+            # All symbols fan out concurrently; zip keeps the input order
+            results = await asyncio.gather(
+                *(self._get_multiple_prices(symbol, exchanges, all_tickers) for symbol in symbols),
+                return_exceptions=True
+            )
+            
+            overview = {}
+            for symbol, result in zip(symbols, results):
+                if isinstance(result, Exception):
+                    overview[symbol] = {"success": False, "error": str(result)}
+                else:
+                    overview[symbol] = result
             
             return {
                 "success": True,
                 "overview": overview,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -205,7 +282,7 @@ class TradingToolsRegistry:
             return {
                 "success": True,
                 "data": result,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -213,49 +290,61 @@ class TradingToolsRegistry:
     async def _analyze_arbitrage(self, symbol: str, exchanges: List[str]) -> Dict[str, Any]:
         """Analyze arbitrage opportunities"""
         try:
-            comparison = await self._compare_top_exchanges(symbol, len(exchanges))
+            # Prices from exactly the requested exchanges, fetched once
+            result = await self._get_multiple_prices(symbol, exchanges)
             
-            if not comparison["success"]:
-                return comparison
+            if not result["success"]:
+                return result
             
             # Calculate arbitrage opportunities
             opportunities = []
-            prices = comparison["comparison"]
-            
-            for i, low_exchange in enumerate(prices):
-                for j, high_exchange in enumerate(prices):
-                    if i != j and low_exchange["price_float"] < high_exchange["price_float"]:
-                        profit_percent = ((high_exchange["price_float"] - low_exchange["price_float"]) / low_exchange["price_float"]) * 100
-                        if profit_percent > 0.1:  # Only show opportunities > 0.1%
-                            opportunities.append({
-                                "buy_exchange": low_exchange["exchange"],
-                                "sell_exchange": high_exchange["exchange"],
-                                "buy_price": low_exchange["price"],
-                                "sell_price": high_exchange["price"],
-                                "profit_percent": round(profit_percent, 4),
-                                "profit_amount": round(high_exchange["price_float"] - low_exchange["price_float"], 8)
-                            })
+            prices = self._parse_sorted_prices(result["data"])
             
-            # Sort by profit percentage
-            opportunities.sort(key=lambda x: x["profit_percent"], reverse=True)
+            n = len(prices)
+            if n > 1:
+                p = np.fromiter((e["price_float"] for e in prices), dtype=np.float64, count=n)
+                # profit[i, j]: percent gained buying on prices[i] and selling on prices[j]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    profit = (p[np.newaxis, :] - p[:, np.newaxis]) / p[:, np.newaxis] * 100.0
+                flat = profit.ravel()
+                candidates = np.flatnonzero(np.isfinite(flat) & (flat > 0.1))  # Only show opportunities > 0.1%
+                if candidates.size > 5:  # Top 5 opportunities
+                    candidates = np.sort(candidates[np.argpartition(-flat[candidates], 5)[:5]])
+                # Stable sort keeps equal-profit pairs in (buy, sell) index order
+                candidates = candidates[np.argsort(-flat[candidates], kind="stable")]
+                
+                # Dicts are only built for the pairs that made the cut
+                for i, j in zip(*np.unravel_index(candidates, profit.shape)):
+                    low_exchange, high_exchange = prices[i], prices[j]
+                    opportunities.append({
+                        "buy_exchange": low_exchange["exchange"],
+                        "sell_exchange": high_exchange["exchange"],
+                        "buy_price": low_exchange["price"],
+                        "sell_price": high_exchange["price"],
+                        "profit_percent": round(float(flat[i * n + j]), 4),
+                        "profit_amount": round(high_exchange["price_float"] - low_exchange["price_float"], 8)
+                    })
             
             return {
                 "success": True,
                 "symbol": symbol,
-                "opportunities": opportunities[:5],  # Top 5 opportunities
-                "market_spread": comparison["price_spread"],
-                "timestamp": datetime.now().isoformat()
+                "opportunities": opportunities,
+                "market_spread": self._price_spread(prices),
+                "timestamp": _now_iso()
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def get_tools_description(self) -> str:
         """Get description of all available tools untuk LLM"""
+        return self._tools_desc_cache
+    
+    def _build_tools_description(self) -> str:
         tools_desc = "Available tools:\n\n"
         
         for tool_name, tool_info in self.tools.items():
             tools_desc += f"**{tool_name}**: {tool_info['description']}\n"
-            tools_desc += f"Parameters: {json.dumps(tool_info['parameters'], indent=2)}\n\n"
+            tools_desc += f"Parameters: {_dumps(tool_info['parameters'])}\n\n"
         
         return tools_desc
     
@@ -273,7 +362,13 @@ class TradingToolsRegistry:
             
             # Validate parameters
             tool_params = self.tools[tool_name]["parameters"]
-            validated_params = self._validate_parameters(parameters, tool_params)
+            validator = self.tools[tool_name]["validator"]
+            if validator is not None:
+                validator(parameters)
+                # Unknown keys pass the schema but aren't accepted by the tool function
+                validated_params = {name: parameters[name] for name in tool_params if name in parameters}
+            else:
+                validated_params = self._validate_parameters(parameters, tool_params)
             
             result = await tool_function(**validated_params)
             return result
@@ -284,6 +379,21 @@ class TradingToolsRegistry:
             logger.error(f"Error executing tool {tool_name}: {e}")
             return {"success": False, "error": f"Tool execution failed: {str(e)}"}
     
+    @staticmethod
+    def _compile_validator(tool_params: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+        """Compile parameter spec tool jadi JSON-schema validator, None kalau fastjsonschema tidak ada"""
+        if fastjsonschema is None:
+            return None
+        schema = {
+            "type": "object",
+            "properties": {
+                name: {key: value for key, value in info.items() if key != "required"}
+                for name, info in tool_params.items()
+            },
+            "required": [name for name, info in tool_params.items() if info.get("required", False)]
+        }
+        return fastjsonschema.compile(schema)
+    
     def _validate_parameters(self, parameters: Dict[str, Any], tool_params: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and clean parameters"""
         validated = {}
@@ -0,0 +1,115 @@
+import time
+
+import orjson
+
+import auth
+from auth import AuthConfig, AuthStore
+
+
+def _store(path) -> AuthStore:
+    return AuthStore(AuthConfig("admin", "secret", str(path)))
+
+
+def _ids_on_disk(path):
+    return orjson.loads(path.read_bytes())["user_ids"]
+
+
+def test_two_processes_keep_each_others_logins(tmp_path):
+    path = tmp_path / "auth.json"
+    api = _store(path)
+    bot = _store(path)
+    api.authenticate(111, "admin", "secret")
+    api.flush()
+
+    # Both sides change the store before seeing the other's write
+    api.authenticate(222, "admin", "secret")
+    bot.authenticate(333, "admin", "secret")
+    api.flush()
+    bot.flush()
+
+    assert _ids_on_disk(path) == [111, 222, 333]
+    assert api.is_authenticated(222) and api.is_authenticated(333)
+    assert bot.is_authenticated(111) and bot.is_authenticated(222)
+
+
+def test_logout_in_one_process_survives_the_others_flush(tmp_path):
+    path = tmp_path / "auth.json"
+    api = _store(path)
+    api.authenticate(111, "admin", "secret")
+    api.authenticate(222, "admin", "secret")
+    api.flush()
+    bot = _store(path)
+
+    bot.logout(111)
+    api.authenticate(333, "admin", "secret")
+    bot.flush()
+    api.flush()
+
+    assert _ids_on_disk(path) == [222, 333]
+    assert not api.is_authenticated(111)
+
+
+def test_pending_changes_stay_visible_after_reload(tmp_path):
+    path = tmp_path / "auth.json"
+    api = _store(path)
+    bot = _store(path)
+    api.authenticate(111, "admin", "secret")
+    bot.authenticate(222, "admin", "secret")
+    bot.flush()
+
+    # api reloads the file written by bot but keeps its own unflushed login
+    assert api.is_authenticated(222)
+    assert api.is_authenticated(111)
+
+
+def test_flush_is_debounced_and_atomic(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "FLUSH_DELAY", 0.05)
+    path = tmp_path / "auth.json"
+    store = _store(path)
+
+    store.authenticate(2, "admin", "secret")
+    store.authenticate(1, "admin", "secret")
+    assert not path.exists()  # burst is still being coalesced
+
+    deadline = time.monotonic() + 2.0
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert _ids_on_disk(path) == [1, 2]
+    assert not (tmp_path / "auth.json.tmp").exists()
+
+
+def test_wrong_password_changes_nothing(tmp_path):
+    path = tmp_path / "auth.json"
+    store = _store(path)
+
+    assert not store.authenticate(1, "admin", "nope")
+    store.flush()
+
+    assert not path.exists()
+    assert not store.is_authenticated(1)
+
+
+def test_flushed_ids_reload_in_new_store(tmp_path):
+    path = tmp_path / "auth.json"
+    store = _store(path)
+    store.authenticate(7, "admin", "secret")
+    store.authenticate(3, "admin", "secret")
+    store.logout(7)
+    store.flush()
+
+    reloaded = _store(path)
+
+    assert _ids_on_disk(path) == [3]
+    assert reloaded.is_authenticated(3)
+    assert not reloaded.is_authenticated(7)
+
+
+def test_large_store_loads_through_mmap(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "MMAP_MIN_SIZE", 1)
+    path = tmp_path / "auth.json"
+    path.write_bytes(orjson.dumps({"user_ids": [5, 4, 5]}))
+
+    store = _store(path)
+
+    assert store.is_authenticated(4) and store.is_authenticated(5)
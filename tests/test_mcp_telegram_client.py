@@ -0,0 +1,198 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import mcp_telegram_client as mtc
+from mcp_telegram_client import MCPClient
+
+
+def _client(handler) -> MCPClient:
+    return MCPClient("http://mcp.test", client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_streamed_orderbook_returns_server_error():
+    pytest.importorskip("ijson")
+
+    def handler(request):
+        return httpx.Response(200, content=orjson.dumps({"success": False, "error": "bad symbol"}))
+
+    result = asyncio.run(_client(handler).get_bybit_orderbook("spot", "NOPE", limit=200))
+
+    assert result == {"success": False, "error": "bad symbol"}
+
+
+def test_streamed_orderbook_projects_levels():
+    pytest.importorskip("ijson")
+    body = {"success": True, "data": {"result": {"s": "BTCUSDT", "a": [["101", "1"]], "b": [["100", "2"]]}}}
+
+    def handler(request):
+        return httpx.Response(200, content=orjson.dumps(body))
+
+    result = asyncio.run(_client(handler).get_bybit_orderbook("spot", "BTCUSDT", limit=200))
+
+    assert result["success"] is True
+    assert result["data"]["result"]["a"] == [["101", "1"]]
+    assert result["data"]["result"]["b"] == [["100", "2"]]
+
+
+def test_streamed_deadline_timeout_does_not_trip_breaker():
+    pytest.importorskip("ijson")
+
+    async def handler(request):
+        await asyncio.sleep(0.1)  # outlives the caller's deadline
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = _client(handler)
+
+    async def run():
+        with mtc.deadline(0.05):
+            return await client._make_request_streamed("/bybit/orderbook", {"a": "data.result.a.item"})
+
+    result = asyncio.run(run())
+
+    assert result == {"success": False, "error": "deadline exceeded"}
+    assert client._breakers["bybit"].failures == 0
+
+
+def test_breaker_opens_then_half_opens_then_closes():
+    breaker = mtc.CircuitBreaker(failure_threshold=2, recovery_timeout=30.0)
+    assert breaker.state == breaker.CLOSED
+
+    breaker.on_failure()
+    assert breaker.state == breaker.CLOSED and breaker.before()
+    breaker.on_failure()
+    assert breaker.state == breaker.OPEN
+    assert not breaker.before()
+
+    # Recovery window elapsed: exactly one probe is let through
+    breaker.opened_at -= 31.0
+    assert breaker.before()
+    assert breaker.state == breaker.HALF_OPEN
+    assert not breaker.before()
+
+    # A failed probe reopens straight away
+    breaker.on_failure()
+    assert breaker.state == breaker.OPEN
+
+    breaker.opened_at -= 31.0
+    assert breaker.before()
+    breaker.on_success()
+    assert breaker.state == breaker.CLOSED and breaker.failures == 0
+
+
+def test_open_breaker_short_circuits_requests():
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    client = _client(handler)
+
+    async def run():
+        # POSTs are never retried, so each call is exactly one upstream hit
+        for _ in range(5):
+            await client._make_request("/bybit/order", method="POST")
+        return await client._make_request("/bybit/order", method="POST")
+
+    result = asyncio.run(run())
+
+    assert calls == 5
+    assert result == {"success": False, "error": "Circuit open for bybit"}
+
+
+def test_get_retries_retryable_status(monkeypatch):
+    monkeypatch.setattr(mtc, "RETRY_BASE_DELAY", 0.0)
+    statuses = [503, 429, 200]
+    seen = []
+
+    def handler(request):
+        status = statuses[len(seen)]
+        seen.append(status)
+        return httpx.Response(status, content=b'{"success": true}')
+
+    result = asyncio.run(_client(handler)._make_request("/bybit/tickers", category="spot"))
+
+    assert seen == [503, 429, 200]
+    assert result == {"success": True}
+
+
+def test_post_is_never_retried(monkeypatch):
+    monkeypatch.setattr(mtc, "RETRY_BASE_DELAY", 0.0)
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503, text="busy")
+
+    result = asyncio.run(_client(handler)._make_request("/bybit/order", method="POST", symbol="BTCUSDT"))
+
+    assert calls == 1
+    assert result["success"] is False
+
+
+def test_get_does_not_retry_client_errors(monkeypatch):
+    monkeypatch.setattr(mtc, "RETRY_BASE_DELAY", 0.0)
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(404, text="not found")
+
+    result = asyncio.run(_client(handler)._make_request("/bybit/tickers"))
+
+    assert calls == 1
+    assert result == {"success": False, "error": "HTTP 404: not found"}
+
+
+def test_cache_coalesces_concurrent_misses():
+    cache = mtc.TTLCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"success": True, "price": 1}
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_set("btc", fetch, 10.0) for _ in range(20)))
+        # Served from the stored entry afterwards
+        results.append(await cache.get_or_set("btc", fetch, 10.0))
+        return results
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(r == {"success": True, "price": 1} for r in results)
+
+
+def test_cache_does_not_store_failures():
+    cache = mtc.TTLCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return {"success": False, "error": "HTTP 503"}
+
+    async def boom():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("upstream exploded")
+
+    async def run():
+        await cache.get_or_set("btc", fetch, 10.0)
+        await cache.get_or_set("btc", fetch, 10.0)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_set("eth", boom, 10.0)
+
+    asyncio.run(run())
+
+    assert calls == 4
@@ -0,0 +1,42 @@
+import asyncio
+import random
+
+from exchange_client import ExchangeClient
+from natural_trading_assistant import TradingToolsRegistry
+
+
+def _brute_force_top5(items):
+    prices = TradingToolsRegistry._parse_sorted_prices(items)
+    pairs = []
+    for low in prices:
+        for high in prices:
+            profit = (high["price_float"] - low["price_float"]) / low["price_float"] * 100
+            if profit > 0.1:
+                pairs.append((round(profit, 4), low["exchange"], high["exchange"]))
+    pairs.sort(key=lambda p: -p[0])
+    return pairs[:5]
+
+
+def test_arbitrage_top5_matches_brute_force(monkeypatch):
+    registry = TradingToolsRegistry(ExchangeClient(), None)
+
+    for seed in range(200):
+        rnd = random.Random(seed)
+        # Few distinct price levels so ties and the 0.1% cut-off both get exercised
+        items = [
+            {"exchange": f"ex{i}", "price": str(round(100 + rnd.choice([0, 0.05, 0.2, 1, 3]) * rnd.random(), 3))}
+            for i in range(rnd.randint(0, 20))
+        ]
+
+        async def fake_prices(symbol, exchanges, items=items):
+            return {"success": True, "symbol": symbol, "data": items}
+
+        monkeypatch.setattr(registry, "_get_multiple_prices", fake_prices)
+        result = asyncio.run(registry._analyze_arbitrage("BTC", []))
+        expected = _brute_force_top5(items)
+
+        got = [(o["profit_percent"], o["buy_exchange"], o["sell_exchange"]) for o in result["opportunities"]]
+        assert [p for p, _, _ in got] == [p for p, _, _ in expected], seed
+        by_exchange = {item["exchange"]: float(item["price"]) for item in items}
+        for profit, buy, sell in got:
+            assert round((by_exchange[sell] - by_exchange[buy]) / by_exchange[buy] * 100, 4) == profit